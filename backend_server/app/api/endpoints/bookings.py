@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import Any, List
 from datetime import datetime, timezone, timedelta
 from app.api.endpoints.payments import create_payment_intent
@@ -8,7 +8,7 @@ from app.db.session import get_db
 from app.models.user import User
 from app.models.property import Property
 from app.models.booking import Booking
-from app.models.enums import BookingStatus, PaymentStatus, PropertyStatus
+from app.models.enums import BookingStatus, PaymentStatus, PropertyStatus, CLOSED_BOOKING_STATUSES
 from app.schemas.booking import (
     BookingResponse,
     BookingCreate,
@@ -18,6 +18,7 @@ from app.schemas.booking import (
     PropertyOwnerBookingView
 )
 from app.schemas.payment import PaymentIntentCreate, PaymentIntentResponse
+from app.services.booking_service import BookingService
 from app.services.email import send_booking_confirmation_email
 import json
 from typing import Optional, List, Dict, Any
@@ -104,22 +105,9 @@ def create_booking(
         )
     
     # Check for overlapping bookings
-    overlapping_booking = db.query(Booking).filter(
-        Booking.property_id == booking_in.property_id,
-        Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-        (
-            (Booking.check_in_date <= booking_in.check_in_date) & 
-            (Booking.check_out_date > booking_in.check_in_date)
-        ) | (
-            (Booking.check_in_date < booking_in.check_out_date) & 
-            (Booking.check_out_date >= booking_in.check_out_date)
-        ) | (
-            (Booking.check_in_date >= booking_in.check_in_date) &
-            (Booking.check_out_date <= booking_in.check_out_date)
-        )
-    ).first()
-    
-    if overlapping_booking:
+    if not BookingService.check_availability(
+        db, booking_in.property_id, booking_in.check_in_date, booking_in.check_out_date
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Property is already booked for these dates"
@@ -201,7 +189,11 @@ def get_my_bookings(
     """
     Get detailed view of user's bookings
     """
-    query = db.query(Booking).filter(Booking.user_id == current_user.id)
+    query = db.query(Booking).options(
+        # BookingResponse embeds the property's provider and the payments
+        selectinload(Booking.property).joinedload(Property.provider),
+        selectinload(Booking.payments),
+    ).filter(Booking.user_id == current_user.id)
     
     if not include_cancelled:
         query = query.filter(Booking.status != BookingStatus.CANCELLED)
@@ -417,10 +409,11 @@ def update_booking(
             detail="Not enough permissions"
         )
     
+    update_data = booking_in.model_dump(exclude_unset=True)
+    
     # Only allow certain updates after confirmation
     if booking.status == BookingStatus.CONFIRMED:
         allowed_fields = ["special_requests", "lead_hunter_name", "lead_hunter_phone", "lead_hunter_email"]
-        update_data = booking_in.dict(exclude_unset=True)
         
         # Admin and provider can update more fields
         if current_user.role in ["admin", "provider"]:
@@ -430,7 +423,7 @@ def update_booking(
         filtered_data = {k: v for k, v in update_data.items() if k in allowed_fields}
     else:
         # All fields allowed for pending bookings
-        filtered_data = booking_in.dict(exclude_unset=True)
+        filtered_data = update_data
     
     # Update booking fields
     for field, value in filtered_data.items():
@@ -473,7 +466,7 @@ def cancel_booking(
         )
     
     # Check if booking can be cancelled
-    if booking.status in [BookingStatus.CANCELLED, BookingStatus.COMPLETED]:
+    if booking.status in CLOSED_BOOKING_STATUSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Booking cannot be cancelled"
@@ -508,6 +501,7 @@ def cancel_booking(
 def confirm_booking(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     booking_id: int,
     current_user: User = Depends(get_current_user),
 ) -> Any:
@@ -542,11 +536,18 @@ def confirm_booking(
     db.commit()
     db.refresh(booking)
     
-    # Send confirmation email
-    try:
-        send_booking_confirmation_email(current_user.email, booking)
-    except Exception as e:
-        print(f"Failed to send confirmation email: {e}")
+    # Send confirmation email after the response; failures are logged there
+    background_tasks.add_task(
+        send_booking_confirmation_email,
+        current_user.email,
+        {
+            "property": {"title": booking.property.property_name},
+            "check_in_date": booking.check_in_date,
+            "check_out_date": booking.check_out_date,
+            "total_price": booking.total_price,
+            "status": booking.status,
+        },
+    )
     
     return {
         "message": "Booking confirmed successfully",
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import Any, List
 from app.core.security import get_current_user
 from app.db.session import get_db
 from app.models.user import User
 from app.models.booking import Booking
-from app.models.enums import BookingStatus, PaymentStatus
+from app.models.enums import BookingStatus, PaymentStatus, OPEN_PAYMENT_STATUSES
 from app.models.payment import Payment
 from app.models.property import Property
 from app.schemas.payment import (
@@ -21,7 +21,9 @@ from app.schemas.payment import (
     CancelAuthorizationRequest,
     PaymentIntentCreate, 
     PaymentIntentResponse,
-    PaymentConfirmRequest
+    PaymentConfirmRequest,
+    serialize_payment,
+    serialize_payment_summaries,
 )
 import stripe
 from app.core.config import settings
@@ -82,7 +84,7 @@ async def create_payment_intent(
     # Check if payment intent already exists for this booking
     existing_payment = db.query(Payment).filter(
         Payment.booking_id == booking.id,
-        Payment.status.in_([PaymentStatus.PENDING, PaymentStatus.AUTHORIZED])
+        Payment.status.in_(OPEN_PAYMENT_STATUSES)
     ).first()
     
     if existing_payment:
@@ -108,10 +110,10 @@ async def create_payment_intent(
             amount=payment_data.amount,
             currency=payment_data.currency,
             
-            # 🔥 KEY CHANGE: Use manual capture for authorization & capture flow
+            # KEY CHANGE: Use manual capture for authorization & capture flow
             capture_method='manual',  # This holds the money without charging
             
-            # 🔥 REMOVED: confirmation_method (conflicts with automatic_payment_methods)
+            # REMOVED: confirmation_method (conflicts with automatic_payment_methods)
             # confirmation_method='automatic',
             
             # Rich metadata for Stripe Dashboard and webhooks
@@ -768,7 +770,7 @@ def read_payments(
         query = db.query(Payment).join(Booking)
     
     payments = query.order_by(Payment.created_at.desc()).offset(skip).limit(limit).all()
-    return payments
+    return Response(content=serialize_payment_summaries(payments), media_type="application/json")
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
 def read_payment(
@@ -797,7 +799,7 @@ def read_payment(
             detail="Not enough permissions"
         )
     
-    return payment
+    return Response(content=serialize_payment(payment), media_type="application/json")
 
 # Legacy endpoints for backward compatibility
 @router.post("/legacy", response_model=PaymentResponse)
@@ -849,7 +851,7 @@ def create_payment_legacy(
     
     db.commit()
     db.refresh(payment)
-    return payment
+    return Response(content=serialize_payment(payment), media_type="application/json")
 
 # Health check endpoint
 @router.get("/health")
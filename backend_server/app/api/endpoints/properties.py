@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy import exists, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload, selectinload
 from typing import Any, List, Optional
+from pydantic import BaseModel
 from app.core.security import get_current_user
-from app.db.session import get_db
+from app.db.session import get_async_db, list_load_options
 from app.models.user import User
 from app.models.property import Property
 from app.models.enums import PropertyStatus
@@ -15,23 +21,42 @@ from app.schemas.property import (
     PropertySearch,
     PropertyDraftCreate,
     PropertyListResponse,
+    PropertyBulkReview,
+    serialize_property_list,
+    parse_property_search,
 )
 from app.schemas.review import Review as ReviewSchema, ReviewCreate
 from app.core.supabase import supabase
-from app.core.cache import cached_query, invalidate_property_cache
+from app.core.cache import cached_query, invalidate_property_cache, property_cache_key, query_cache
+import hashlib
 import json
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Fields providers cannot change once a property is approved
+_LOCKED_FIELDS = frozenset({'property_name', 'address', 'city', 'state', 'zip_code', 'latitude', 'longitude'})
+
+# Public URL prefix of files in the property-images storage bucket
+_SUPABASE_PREFIX = '/storage/v1/object/public/property-images/'
+
+# Sort fields that can be paged with after_id: non-null columns, so the
+# (sort column, id) row comparison is always defined
+CURSOR_SORT_FIELDS = frozenset({'id', 'created_at', 'property_name', 'city', 'state', 'total_acres'})
+
+# Fields stored as JSONB that need converting from Pydantic models
+_JSONB_FIELDS = frozenset({'acreage_breakdown', 'wildlife_info', 'hunting_packages', 'accommodations', 'property_images'})
 
 def validate_provider_permissions(current_user: User):
     """
     Helper function to validate provider permissions with detailed error messages
     """
-    print(f"VALIDATION DEBUG: Checking user permissions")
-    print(f"VALIDATION DEBUG: User ID: {current_user.id}")
-    print(f"VALIDATION DEBUG: User email: {current_user.email}")
-    print(f"VALIDATION DEBUG: User role: '{current_user.role}'")
-    print(f"VALIDATION DEBUG: Host application status: '{current_user.host_application_status}'")
+    logger.debug("VALIDATION DEBUG: Checking user permissions")
+    logger.debug("VALIDATION DEBUG: User ID: %s", current_user.id)
+    logger.debug("VALIDATION DEBUG: User email: %s", current_user.email)
+    logger.debug("VALIDATION DEBUG: User role: '%s'", current_user.role)
+    logger.debug("VALIDATION DEBUG: Host application status: '%s'", current_user.host_application_status)
     
     # Check if user role is provider
     user_role = (current_user.role or "").lower().strip()
@@ -49,15 +74,15 @@ def validate_provider_permissions(current_user: User):
             detail=f"Must have approved host application status to create properties. Current status: '{current_user.host_application_status}'"
         )
     
-    print(f"VALIDATION DEBUG: User validation passed!")
+    logger.debug("VALIDATION DEBUG: User validation passed!")
 
 def convert_pydantic_to_dict(obj):
     """
     Helper function to convert Pydantic models to dictionaries for JSON serialization
     """
-    if hasattr(obj, 'dict'):
+    if isinstance(obj, BaseModel):
         # It's a Pydantic model
-        return obj.dict()
+        return obj.model_dump()
     elif isinstance(obj, list):
         # It's a list, convert each item
         return [convert_pydantic_to_dict(item) for item in obj]
@@ -71,21 +96,19 @@ def convert_pydantic_to_dict(obj):
 @router.post("/draft", response_model=PropertySchema)
 async def create_property_draft(
     property_data: PropertyDraftCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Create a draft property with phase 1 data only
     """
-    print("=" * 60)
-    print("CREATE DRAFT: Starting draft property creation")
-    print("=" * 60)
+    logger.debug("CREATE DRAFT: Starting draft property creation")
     
     try:
         validate_provider_permissions(current_user)
         
-        print(f"CREATE DRAFT: User validation passed")
-        print(f"CREATE DRAFT: Processing draft data...")
+        logger.debug("CREATE DRAFT: User validation passed")
+        logger.debug("CREATE DRAFT: Processing draft data...")
         
         # Validate that at least profile image has been uploaded
         if not property_data.property_images or len(property_data.property_images) == 0:
@@ -99,13 +122,13 @@ async def create_property_draft(
         wildlife_info_dict = convert_pydantic_to_dict(property_data.wildlife_info) if property_data.wildlife_info else []
         property_images_dict = convert_pydantic_to_dict(property_data.property_images)
         
-        print(f"CREATE DRAFT: Converted data to dictionaries")
-        print(f"CREATE DRAFT: Acreage breakdown: {acreage_breakdown_dict}")
-        print(f"CREATE DRAFT: Wildlife info: {wildlife_info_dict}")
+        logger.debug("CREATE DRAFT: Converted data to dictionaries")
+        logger.debug("CREATE DRAFT: Acreage breakdown: %s", acreage_breakdown_dict)
+        logger.debug("CREATE DRAFT: Wildlife info: %s", wildlife_info_dict)
         
         # Create draft property with phase 1 data
         property_obj = Property(
-            provider_id=current_user.id,
+            provider=current_user,
             property_name=property_data.property_name,
             description=property_data.description,
             address=property_data.address,
@@ -132,23 +155,20 @@ async def create_property_draft(
         )
         
         db.add(property_obj)
-        db.commit()
-        db.refresh(property_obj)
+        await db.commit()
         
         # Invalidate property cache
-        invalidate_property_cache(property_obj.id)
+        await invalidate_property_cache(property_obj.id)
         
-        print(f"CREATE DRAFT: SUCCESS - Draft created with ID: {property_obj.id}")
-        print("=" * 60)
+        logger.debug("CREATE DRAFT: SUCCESS - Draft created with ID: %s", property_obj.id)
         
         return property_obj
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"CREATE DRAFT: UNEXPECTED ERROR - {str(e)}")
-        print("=" * 60)
-        db.rollback()
+        logger.error("CREATE DRAFT: UNEXPECTED ERROR - %s", e)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create draft: {str(e)}"
@@ -158,13 +178,13 @@ async def create_property_draft(
 async def complete_property_draft(
     property_id: int,
     property_data: PropertyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Complete a draft property with all remaining data
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    property_obj = await db.get(Property, property_id, options=[joinedload(Property.provider)])
     
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
@@ -180,7 +200,7 @@ async def complete_property_draft(
     
     try:
         # Convert Pydantic models to dictionaries
-        update_data = property_data.dict(exclude_unset=True)
+        update_data = property_data.model_dump(exclude_unset=True)
         
         # Ensure required phase 2 fields are present
         if not update_data.get('hunting_packages') or len(update_data['hunting_packages']) == 0:
@@ -196,8 +216,8 @@ async def complete_property_draft(
             )
         
         # Convert complex fields to dictionaries
-        for field in ['acreage_breakdown', 'wildlife_info', 'hunting_packages', 'accommodations', 'property_images']:
-            if field in update_data and update_data[field] is not None:
+        for field in _JSONB_FIELDS & update_data.keys():
+            if update_data[field] is not None:
                 update_data[field] = convert_pydantic_to_dict(update_data[field])
         
         # Update all fields
@@ -208,18 +228,17 @@ async def complete_property_draft(
         property_obj.status = PropertyStatus.PENDING
         property_obj.draft_completed_phase = 2
         
-        db.commit()
-        db.refresh(property_obj)
+        await db.commit()
         
         # Invalidate property cache
-        invalidate_property_cache(property_obj.id)
+        await invalidate_property_cache(property_obj.id)
         
         return property_obj
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to complete draft: {str(e)}"
@@ -228,14 +247,14 @@ async def complete_property_draft(
 @router.put("/{property_id}/toggle-listing", response_model=PropertySchema)
 async def toggle_property_listing(
     property_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
     Toggle property listing status (list/delist)
     Only approved properties can be listed/delisted
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    property_obj = await db.get(Property, property_id, options=[joinedload(Property.provider)])
     
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
@@ -251,18 +270,17 @@ async def toggle_property_listing(
     
     # Toggle the listing status
     property_obj.is_listed = not property_obj.is_listed
-    db.commit()
-    db.refresh(property_obj)
+    await db.commit()
     
     # Invalidate property cache
-    invalidate_property_cache(property_obj.id)
+    await invalidate_property_cache(property_obj.id)
     
     return property_obj
 
 @router.post("/", response_model=PropertySchema)
 async def create_property(
     property_data: PropertyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
@@ -270,17 +288,15 @@ async def create_property(
     Accepts JSON data with property details including uploaded image URLs
     """
     
-    print("=" * 60)
-    print("CREATE PROPERTY: Starting property creation process")
-    print("=" * 60)
+    logger.debug("CREATE PROPERTY: Starting property creation process")
     
     try:
         # Validate user permissions first
         validate_provider_permissions(current_user)
         
-        print(f"CREATE PROPERTY: User validation passed")
-        print(f"CREATE PROPERTY: Processing property data...")
-        print(f"CREATE PROPERTY: Received property_images: {property_data.property_images}")
+        logger.debug("CREATE PROPERTY: User validation passed")
+        logger.debug("CREATE PROPERTY: Processing property data...")
+        logger.debug("CREATE PROPERTY: Received property_images: %s", property_data.property_images)
         
         # Validate that images have been uploaded
         if not property_data.property_images or len(property_data.property_images) == 0:
@@ -296,10 +312,10 @@ async def create_property(
         accommodations_dict = convert_pydantic_to_dict(property_data.accommodations)
         property_images_dict = convert_pydantic_to_dict(property_data.property_images)
         
-        print(f"CREATE PROPERTY: Creating property database record...")
+        logger.debug("CREATE PROPERTY: Creating property database record...")
         
         property_obj = Property(
-            provider_id=current_user.id,
+            provider=current_user,
             property_name=property_data.property_name,
             description=property_data.description,
             address=property_data.address,
@@ -328,14 +344,12 @@ async def create_property(
         )
         
         db.add(property_obj)
-        db.commit()
-        db.refresh(property_obj)
+        await db.commit()
         
         # Invalidate property cache
-        invalidate_property_cache(property_obj.id)
+        await invalidate_property_cache(property_obj.id)
         
-        print(f"CREATE PROPERTY: SUCCESS - Property created with ID: {property_obj.id}")
-        print("=" * 60)
+        logger.debug("CREATE PROPERTY: SUCCESS - Property created with ID: %s", property_obj.id)
         
         return property_obj
         
@@ -343,11 +357,10 @@ async def create_property(
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        print(f"CREATE PROPERTY: UNEXPECTED ERROR - {str(e)}")
-        print("=" * 60)
+        logger.error("CREATE PROPERTY: UNEXPECTED ERROR - %s", e)
         
         # Rollback database changes
-        db.rollback()
+        await db.rollback()
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -355,8 +368,8 @@ async def create_property(
         )
 
 @router.get("/pending", response_model=List[PropertySchema])
-def list_pending_properties(
-    db: Session = Depends(get_db),
+async def list_pending_properties(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
@@ -365,13 +378,19 @@ def list_pending_properties(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return db.query(Property).filter(Property.status == PropertyStatus.PENDING).all()
+    result = await db.execute(
+        select(Property)
+        .options(selectinload(Property.provider), *list_load_options())
+        .where(Property.status == PropertyStatus.PENDING)
+        .order_by(Property.id)
+    )
+    return result.scalars().all()
 
 @router.post("/{property_id}/approve", response_model=PropertySchema)
-def approve_property(
+async def approve_property(
     property_id: int,
     admin_feedback: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
@@ -380,28 +399,36 @@ def approve_property(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    values = {
+        "status": PropertyStatus.APPROVED,
+        "is_listed": True,  # Automatically list when approved
+    }
+    if admin_feedback:
+        values["admin_feedback"] = admin_feedback
+    
+    # Single UPDATE ... RETURNING instead of SELECT-then-UPDATE
+    property_obj = (await db.execute(
+        update(Property)
+        .where(Property.id == property_id)
+        .values(**values)
+        .returning(Property)
+        .options(selectinload(Property.provider))
+    )).scalar_one_or_none()
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
     
-    property_obj.status = PropertyStatus.APPROVED
-    property_obj.is_listed = True  # Automatically list when approved
-    if admin_feedback:
-        property_obj.admin_feedback = admin_feedback
-    
-    db.commit()
-    db.refresh(property_obj)
+    await db.commit()
     
     # Invalidate property cache
-    invalidate_property_cache(property_obj.id)
+    await invalidate_property_cache(property_obj.id)
     
     return property_obj
 
 @router.post("/{property_id}/reject", response_model=PropertySchema)
-def reject_property(
+async def reject_property(
     property_id: int,
     admin_feedback: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
@@ -410,25 +437,73 @@ def reject_property(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    # Single UPDATE ... RETURNING instead of SELECT-then-UPDATE
+    property_obj = (await db.execute(
+        update(Property)
+        .where(Property.id == property_id)
+        .values(
+            status=PropertyStatus.REJECTED,
+            is_listed=False,  # Ensure rejected properties are not listed
+            admin_feedback=admin_feedback,
+        )
+        .returning(Property)
+        .options(selectinload(Property.provider))
+    )).scalar_one_or_none()
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
     
-    property_obj.status = PropertyStatus.REJECTED
-    property_obj.is_listed = False  # Ensure rejected properties are not listed
-    property_obj.admin_feedback = admin_feedback
-    
-    db.commit()
-    db.refresh(property_obj)
+    await db.commit()
     
     # Invalidate property cache
-    invalidate_property_cache(property_obj.id)
+    await invalidate_property_cache(property_obj.id)
     
     return property_obj
 
-@cached_query(ttl=300, cache_key_prefix="properties")
-def _get_properties_cached(
-    db: Session,
+# Listing flag that goes with each moderation outcome
+_REVIEW_LISTED = {
+    PropertyStatus.APPROVED: True,
+    PropertyStatus.REJECTED: False,
+}
+
+@router.post("/bulk-review", response_model=dict)
+async def bulk_review_properties(
+    review_in: PropertyBulkReview,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Admin: Approve and/or reject many properties in one transaction
+    Runs one UPDATE per target status instead of one request per property
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    ids_by_status = {}
+    for item in review_in.items:
+        item_status = PropertyStatus(item.status.value)
+        if item_status not in _REVIEW_LISTED:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {item.status.value}")
+        ids_by_status.setdefault(item_status, set()).add(item.id)
+    
+    updated = {}
+    for review_status, ids in ids_by_status.items():
+        result = await db.execute(
+            update(Property)
+            .where(Property.id.in_(ids))
+            .values(status=review_status, is_listed=_REVIEW_LISTED[review_status])
+        )
+        updated[review_status.value.lower()] = result.rowcount
+    
+    await db.commit()
+    
+    # Without an id this drops every detail entry as well as the lists
+    await invalidate_property_cache()
+    
+    return {"updated": updated}
+
+@cached_query(ttl=60, cache_key_prefix="properties_list")
+async def _get_properties_cached(
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 20,
     search_params: dict = None,
@@ -436,76 +511,142 @@ def _get_properties_cached(
     listed_only: bool = True,
     sort_by: str = "created_at",
     sort_order: str = "desc",
-) -> tuple:
+    after_id: Optional[int] = None,
+) -> bytes:
     """
     Cached function to retrieve properties with pagination and search filters
-    Returns tuple of (properties, total_count)
+    Returns the serialized PropertyListResponse, so the cache never holds ORM objects
+    When after_id is given, pages by keyset from that row (in the same sort) instead of offset
     """
-    from sqlalchemy.orm import joinedload
-    
-    query = db.query(Property).options(
-        joinedload(Property.provider)  # Include provider information
-    )
+    query = select(Property)
     
     # Filter by approval status if requested
     if approved_only:
-        print(f"DEBUG: Filtering by status = {PropertyStatus.APPROVED}")
-        query = query.filter(Property.status == PropertyStatus.APPROVED)
+        logger.debug("DEBUG: Filtering by status = %s", PropertyStatus.APPROVED)
+        query = query.where(Property.status == PropertyStatus.APPROVED)
     
     # Filter by listing status if requested
     if listed_only:
-        query = query.filter(Property.is_listed == True)
+        query = query.where(Property.is_listed == True)
     
     if search_params:
         # New search filters
         if search_params.get('hunting_type'):
-            query = query.filter(Property.hunting_packages.op('?')(search_params['hunting_type']))
+            query = query.where(Property.hunting_packages.op('?')(search_params['hunting_type']))
         if search_params.get('min_acres'):
-            query = query.filter(Property.total_acres >= search_params['min_acres'])
+            query = query.where(Property.total_acres >= search_params['min_acres'])
         if search_params.get('max_acres'):
-            query = query.filter(Property.total_acres <= search_params['max_acres'])
+            query = query.where(Property.total_acres <= search_params['max_acres'])
         if search_params.get('wildlife_species'):
-            query = query.filter(Property.wildlife_info.op('?')(search_params['wildlife_species']))
+            query = query.where(Property.wildlife_info.op('?')(search_params['wildlife_species']))
         
         # Location search filters
         if search_params.get('city'):
-            query = query.filter(Property.city.ilike(f"%{search_params['city']}%"))
+            query = query.where(Property.city.ilike(f"%{search_params['city']}%"))
         if search_params.get('state'):
-            query = query.filter(Property.state.ilike(f"%{search_params['state']}%"))
+            query = query.where(Property.state.ilike(f"%{search_params['state']}%"))
     
-    # Count total before pagination
-    total = query.count()
+    # Everything matching the filters, before paging; total counts this
+    filtered = query
     
-    # Apply sorting
-    if hasattr(Property, sort_by):
-        order_column = getattr(Property, sort_by)
-        if sort_order.lower() == "desc":
-            query = query.order_by(order_column.desc())
+    # Apply sorting; id breaks ties so every row has one position in the order,
+    # which keeps offset pages stable and lets an id serve as the cursor
+    order_column = getattr(Property, sort_by) if hasattr(Property, sort_by) else None
+    descending = sort_order.lower() == "desc"
+    if order_column is not None:
+        if descending:
+            query = query.order_by(order_column.desc(), Property.id.desc())
         else:
-            query = query.order_by(order_column.asc())
+            query = query.order_by(order_column.asc(), Property.id.asc())
+    
+    if after_id is not None:
+        # Keyset pagination: continue after the cursor row in the same
+        # (sort column, id) order, so the cost doesn't grow with depth
+        cursor = aliased(Property)
+        cursor_key = tuple_(
+            select(getattr(cursor, sort_by)).where(cursor.id == after_id).scalar_subquery(),
+            after_id,
+        )
+        row_key = tuple_(order_column, Property.id)
+        query = query.where(row_key < cursor_key if descending else row_key > cursor_key)
+        # The cursor predicate would shrink a window count, so count the filters alone
+        total_column = select(func.count()).select_from(filtered.subquery()).scalar_subquery()
+    else:
+        query = query.offset(skip)
+        # count(*) OVER () returns the total with the page, no separate COUNT query
+        total_column = func.count().over()
     
-    # Apply pagination
-    properties = query.offset(skip).limit(limit).all()
+    result = await db.execute(
+        query.add_columns(total_column.label("total")).options(
+            # selectinload fetches each distinct provider once instead of
+            # repeating the user row on every property in the page
+            selectinload(Property.provider),
+            *list_load_options()
+        ).limit(limit)
+    )
+    rows = result.all()
+    properties = [row[0] for row in rows]
+    
+    if rows:
+        total = rows[0].total
+    elif skip or after_id is not None:
+        # Page past the end: the total has no row to ride on
+        total = (await db.execute(
+            select(func.count()).select_from(filtered.subquery())
+        )).scalar_one()
+    else:
+        total = 0
+    
+    # Every full page carries a cursor, the first one included, so a client
+    # can switch from offset paging to keyset paging at any point
+    next_cursor = None
+    if sort_by in CURSOR_SORT_FIELDS and len(properties) == limit:
+        next_cursor = properties[-1].id
     
-    return properties, total
+    return serialize_property_list({
+        "items": properties,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
+
+def _property_search(request: Request) -> Optional[PropertySearch]:
+    # One prebuilt validator over the raw query params instead of a
+    # dependency parameter per search field
+    try:
+        return parse_property_search(request.query_params)
+    except ValidationError as e:
+        # Report bad filters as a 422 like any other query parameter
+        raise RequestValidationError(
+            [{**err, "loc": ("query", *err["loc"])} for err in e.errors()]
+        )
 
 @router.get("/", response_model=PropertyListResponse)
-def read_properties(
+async def read_properties(
     *,
-    response: Response,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 20,
-    search: PropertySearch = None,
+    search: Optional[PropertySearch] = Depends(_property_search),
     approved_only: bool = True,
     listed_only: bool = True,  # New parameter
     sort_by: str = "created_at",
     sort_order: str = "desc",
+    after_id: Optional[int] = None,
 ) -> Any:
     """
     Retrieve properties with pagination and enhanced search filters
     By default, only shows approved and listed properties
+    Pass after_id (the previous page's next_cursor) for keyset pagination;
+    it continues in the same sort_by/sort_order as the page it came from
     """
+    if after_id is not None and sort_by not in CURSOR_SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"after_id can't be used with sort_by={sort_by}; use one of {sorted(CURSOR_SORT_FIELDS)}"
+        )
     # Convert search object to dict for caching
     search_params = None
     if search:
@@ -519,7 +660,7 @@ def read_properties(
         }
     
     # Use cached function
-    properties, total = _get_properties_cached(
+    content = await _get_properties_cached(
         db=db,
         skip=skip,
         limit=limit,
@@ -527,23 +668,21 @@ def read_properties(
         approved_only=approved_only,
         listed_only=listed_only,
         sort_by=sort_by,
-        sort_order=sort_order
-    )
-    
-    # Set caching headers
-    response.headers["Cache-Control"] = "public, max-age=300"  # 5 minutes
-    response.headers["ETag"] = f"properties-{hash(str(properties))}"
-    
-    return PropertyListResponse(
-        items=properties,
-        total=total,
-        skip=skip,
-        limit=limit
+        sort_order=sort_order,
+        after_id=after_id,
     )
+    headers = {
+        "Cache-Control": "public, max-age=300",  # 5 minutes
+        "ETag": f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"',
+    }
+    # Conditional GET: an unchanged page goes back without a body
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 @router.get("/my-properties", response_model=List[PropertySchema])
-def get_my_properties(
-    db: Session = Depends(get_db),
+async def get_my_properties(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     include_drafts: bool = True,  # Include drafts by default
     status: Optional[str] = None,  # Filter by specific status
@@ -558,12 +697,14 @@ def get_my_properties(
             detail=f"Must be a provider to view properties. Current role: '{current_user.role}'"
         )
     
-    query = db.query(Property).filter(Property.provider_id == current_user.id)
+    query = select(Property).options(
+        selectinload(Property.provider)
+    ).where(Property.provider_id == current_user.id)
     
     # Filter by status if specified
     if status:
         if status.upper() in [s for s in PropertyStatus]:
-            query = query.filter(Property.status == status.upper())
+            query = query.where(Property.status == status.upper())
         else:
             raise HTTPException(
                 status_code=400,
@@ -571,14 +712,15 @@ def get_my_properties(
             )
     elif not include_drafts:
         # Exclude drafts if not explicitly included
-        query = query.filter(Property.status != PropertyStatus.DRAFT)
+        query = query.where(Property.status != PropertyStatus.DRAFT)
     
-    return query.all()
+    result = await db.execute(query)
+    return result.scalars().all()
 
 @router.get("/{property_id}", response_model=PropertySchema)
-def read_property(
+async def read_property(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     property_id: int,
     current_user: Optional[User] = Depends(get_current_user),
 ) -> Any:
@@ -587,24 +729,72 @@ def read_property(
     Public can view approved, listed properties
     Providers can view their own properties in any status
     """
-    # Join with User table to get provider information
-    from sqlalchemy.orm import joinedload
+    # Serve the serialized property from cache when possible; the access check
+    # below only needs provider_id/status/is_listed, which are in the dict
+    cache_key = property_cache_key(property_id)
+    property_dict = await query_cache.aget(cache_key)
+    if property_dict is None:
+        # Join with User table to get provider information
+        property_obj = await db.get(
+            Property,
+            property_id,
+            options=[joinedload(Property.provider)],  # This loads the user data
+        )
     
-    property_obj = db.query(Property).options(
-        joinedload(Property.provider)  # This loads the user data
-    ).filter(Property.id == property_id).first()
+        if not property_obj:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found"
+            )
     
-    if not property_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Property not found"
-        )
+        # Convert to dict and add provider info
+        property_dict = {
+            "id": property_obj.id,
+            "provider_id": property_obj.provider_id,
+            "property_name": property_obj.property_name,
+            "description": property_obj.description,
+            "address": property_obj.address,
+            "city": property_obj.city,
+            "state": property_obj.state,
+            "zip_code": property_obj.zip_code,
+            "country": property_obj.country,
+            "latitude": property_obj.latitude,
+            "longitude": property_obj.longitude,
+            "total_acres": property_obj.total_acres,
+            # "primary_terrain": property_obj.primary_terrain,
+            "acreage_breakdown": property_obj.acreage_breakdown,
+            "wildlife_info": property_obj.wildlife_info,
+            "hunting_packages": property_obj.hunting_packages,
+            "accommodations": property_obj.accommodations,
+            "facilities": property_obj.facilities,
+            "rules": property_obj.rules,
+            "safety_info": property_obj.safety_info,
+            "license_requirements": property_obj.license_requirements,
+            "season_info": property_obj.season_info,
+            "property_images": property_obj.property_images,
+            "profile_image_index": property_obj.profile_image_index,
+            "status": property_obj.status,
+            "admin_feedback": property_obj.admin_feedback,
+            "is_listed": property_obj.is_listed,
+            "draft_completed_phase": property_obj.draft_completed_phase,
+            "created_at": property_obj.created_at,
+            "updated_at": property_obj.updated_at,
+            # Add provider information
+            "provider": {
+                "id": property_obj.provider.id,
+                "full_name": property_obj.provider.full_name,
+                "username": property_obj.provider.username,
+                "avatar_url": property_obj.provider.avatar_url,
+                "created_at": property_obj.provider.created_at,
+            } if property_obj.provider else None
+        }
+        await query_cache.aset(cache_key, property_dict, 60)
     
     # Check access permissions
-    if current_user and property_obj.provider_id == current_user.id:
+    if current_user and property_dict["provider_id"] == current_user.id:
         # Provider can view their own property in any status
         pass
-    elif property_obj.status == PropertyStatus.APPROVED and property_obj.is_listed:
+    elif property_dict["status"] == PropertyStatus.APPROVED and property_dict["is_listed"]:
         # Public can view approved and listed properties
         pass
     else:
@@ -613,55 +803,13 @@ def read_property(
             detail="Not authorized to view this property"
         )
     
-    # Convert to dict and add provider info
-    property_dict = {
-        "id": property_obj.id,
-        "provider_id": property_obj.provider_id,
-        "property_name": property_obj.property_name,
-        "description": property_obj.description,
-        "address": property_obj.address,
-        "city": property_obj.city,
-        "state": property_obj.state,
-        "zip_code": property_obj.zip_code,
-        "country": property_obj.country,
-        "latitude": property_obj.latitude,
-        "longitude": property_obj.longitude,
-        "total_acres": property_obj.total_acres,
-        # "primary_terrain": property_obj.primary_terrain,
-        "acreage_breakdown": property_obj.acreage_breakdown,
-        "wildlife_info": property_obj.wildlife_info,
-        "hunting_packages": property_obj.hunting_packages,
-        "accommodations": property_obj.accommodations,
-        "facilities": property_obj.facilities,
-        "rules": property_obj.rules,
-        "safety_info": property_obj.safety_info,
-        "license_requirements": property_obj.license_requirements,
-        "season_info": property_obj.season_info,
-        "property_images": property_obj.property_images,
-        "profile_image_index": property_obj.profile_image_index,
-        "status": property_obj.status,
-        "admin_feedback": property_obj.admin_feedback,
-        "is_listed": property_obj.is_listed,
-        "draft_completed_phase": property_obj.draft_completed_phase,
-        "created_at": property_obj.created_at,
-        "updated_at": property_obj.updated_at,
-        # Add provider information
-        "provider": {
-            "id": property_obj.provider.id,
-            "full_name": property_obj.provider.full_name,
-            "username": property_obj.provider.username,
-            "avatar_url": property_obj.provider.avatar_url,
-            "created_at": property_obj.provider.created_at,
-        } if property_obj.provider else None
-    }
-    
     return property_dict
 
 
 @router.put("/{property_id}", response_model=PropertySchema)
-def update_property(
+async def update_property(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     property_id: int,
     property_in: PropertyUpdate,
     current_user: User = Depends(get_current_user),
@@ -670,7 +818,7 @@ def update_property(
     Update property
     For approved properties, certain fields are locked
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    property_obj = await db.get(Property, property_id, options=[joinedload(Property.provider)])
     if not property_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -682,19 +830,17 @@ def update_property(
             detail="Not enough permissions"
         )
     
-    update_data = property_in.dict(exclude_unset=True)
+    update_data = property_in.model_dump(exclude_unset=True)
     
     # If property is approved, prevent changes to locked fields
     if property_obj.status == PropertyStatus.APPROVED and current_user.role != "admin":
-        locked_fields = ['property_name', 'address', 'city', 'state', 'zip_code', 'latitude', 'longitude']
-        for field in locked_fields:
-            if field in update_data:
-                del update_data[field]
-                print(f"Removed locked field {field} from update for approved property")
+        for field in _LOCKED_FIELDS & update_data.keys():
+            del update_data[field]
+            logger.debug("Removed locked field %s from update for approved property", field)
     
     # Convert complex fields to dictionaries
-    for field in ['acreage_breakdown', 'wildlife_info', 'hunting_packages', 'accommodations', 'property_images']:
-        if field in update_data and update_data[field] is not None:
+    for field in _JSONB_FIELDS & update_data.keys():
+        if update_data[field] is not None:
             update_data[field] = convert_pydantic_to_dict(update_data[field])
     
     # Update fields
@@ -715,25 +861,34 @@ def update_property(
     # If APPROVED, status remains APPROVED regardless of changes
     
     db.add(property_obj)
-    db.commit()
-    db.refresh(property_obj)
+    await db.commit()
     
     # Invalidate property cache
-    invalidate_property_cache(property_obj.id)
+    await invalidate_property_cache(property_obj.id)
     
     return property_obj
 
 @router.delete("/{property_id}")
-def delete_property(
+async def delete_property(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     property_id: int,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Delete property
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    # Preload the cascaded children so the delete doesn't lazy-load them
+    # one relationship (and one booking's payments) at a time
+    property_obj = await db.get(
+        Property,
+        property_id,
+        options=[
+            selectinload(Property.bookings).selectinload(Booking.payments),
+            selectinload(Property.reviews),
+            selectinload(Property.wishlists),
+        ],
+    )
     if not property_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -747,29 +902,29 @@ def delete_property(
     
     # Delete associated images from storage
     if property_obj.property_images:
+        paths = []
         for image in property_obj.property_images:
+            # Extract the storage path from the public URL
+            if isinstance(image, dict):
+                url = image.get('url')
+            else:
+                url = image
+            if isinstance(url, str):
+                _, sep, file_path = url.rpartition(_SUPABASE_PREFIX)
+                if sep:
+                    paths.append(file_path)
+        
+        if paths:
             try:
-                # Extract filename from URL and delete from Supabase
-                if isinstance(image, dict) and 'url' in image:
-                    # Parse the URL to get the file path
-                    url_parts = image['url'].split('/storage/v1/object/public/property-images/')
-                    if len(url_parts) > 1:
-                        file_path = url_parts[1]
-                        supabase.storage.from_('property-images').remove([file_path])
-                elif isinstance(image, str):
-                    # Handle string URLs
-                    url_parts = image.split('/storage/v1/object/public/property-images/')
-                    if len(url_parts) > 1:
-                        file_path = url_parts[1]
-                        supabase.storage.from_('property-images').remove([file_path])
+                supabase.storage.from_('property-images').remove(paths)
             except Exception as e:
-                print(f"Error deleting image from storage: {e}")
+                logger.warning("Error deleting image from storage: %s", e)
     
-    db.delete(property_obj)
-    db.commit()
+    await db.delete(property_obj)
+    await db.commit()
     
     # Invalidate property cache
-    invalidate_property_cache(property_id)
+    await invalidate_property_cache(property_id)
     
     return {"message": "Property deleted successfully"}
 
@@ -777,24 +932,27 @@ def delete_property(
 async def create_review(
     property_id: int,
     review_in: ReviewCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a review for a property.
     """
-    # Check if property exists
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
-    if not property_obj:
+    # Check that the property exists and the user hasn't reviewed it yet,
+    # as two EXISTS probes in one query (no rows are loaded)
+    property_exists, already_reviewed = (await db.execute(
+        select(
+            exists().where(Property.id == property_id),
+            exists().where(
+                Review.property_id == property_id,
+                Review.user_id == current_user.id
+            ),
+        )
+    )).one()
+    if not property_exists:
         raise HTTPException(status_code=404, detail="Property not found")
     
-    # Check if user has already reviewed this property
-    existing_review = db.query(Review).filter(
-        Review.property_id == property_id,
-        Review.user_id == current_user.id
-    ).first()
-    
-    if existing_review:
+    if already_reviewed:
         raise HTTPException(
             status_code=400, 
             detail="You have already reviewed this property"
@@ -807,20 +965,30 @@ async def create_review(
         comment=review_in.comment
     )
     db.add(review)
-    db.commit()
-    db.refresh(review)
+    await db.commit()
     return review
 
-@router.get("/{property_id}/reviews/", response_model=List[ReviewSchema])
+@router.get("/{property_id}/reviews/", response_model=List[ReviewSchema], response_class=ORJSONResponse)
 async def list_reviews(
     property_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all reviews for a property.
+    Reviews are flat rows, so the columns are serialized straight to JSON
+    without building ORM objects or Pydantic models.
     """
-    reviews = db.query(Review).filter(Review.property_id == property_id).all()
-    return reviews
+    result = await db.execute(
+        select(
+            Review.id,
+            Review.user_id,
+            Review.property_id,
+            Review.rating,
+            Review.comment,
+            Review.created_at,
+        ).where(Review.property_id == property_id)
+    )
+    return ORJSONResponse([dict(row) for row in result.mappings()])
 
 @router.get("/test-supabase", response_model=dict)
 async def test_supabase_connection(
@@ -1,17 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Optional
-from app.core.security import get_current_user, get_password_hash, get_supabase_user
-from app.db.session import get_db
+from app.core.security import get_current_user, get_password_hash_async, get_supabase_user
+from app.db.session import get_async_db, list_load_options
+from app.core.cache import invalidate_property_cache, invalidate_user_cache, query_cache, user_profile_cache_key
 from app.models.user import User
-from app.schemas.user import User as UserSchema, UserUpdate
+from app.schemas.user import User as UserSchema, UserUpdate, serialize_users
 from app.models.host_application import HostApplication
-from app.models.enums import ApplicationStatus
+from app.models.enums import ApplicationStatus, REVIEWED_APPLICATION_STATUSES
 from app.schemas.host_application import HostApplication as HostApplicationSchema, HostApplicationCreate, HostApplicationReview
 from sqlalchemy.sql import func
-import json
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_HOST_APPLICATIONS_PAGE = 200
+USER_PROFILE_CACHE_TTL = 60  # seconds
+
+# Frontend camelCase keys that map onto differently named model columns
+_FIELD_ALIASES = {
+    "fullName": "full_name",
+    "zipCode": "zip_code",
+    "avatarUrl": "avatar_url",
+}
+
+async def _apply_user_update(current_user: User, update_data: dict) -> None:
+    """
+    Copy update fields onto the user, mapping camelCase keys and hashing the password.
+    None values are applied as-is, so avatar_url can be cleared.
+    """
+    for field, value in update_data.items():
+        key = _FIELD_ALIASES.get(field, field)
+        if key == "password" and value:
+            value = await get_password_hash_async(value)
+        setattr(current_user, key, value)
+
+async def _invalidate_profile_caches(user: User) -> None:
+    """
+    Drop caches holding this user's profile. A provider's name and avatar are
+    also embedded in cached property lists and wishlist pages.
+    """
+    await invalidate_user_cache(user.id)
+    if (user.role or "").lower() == "provider":
+        await invalidate_property_cache()
+
+async def _check_email_username_available(db: AsyncSession, user_in: UserUpdate, current_user: User) -> None:
+    """
+    Raise 400 if a changed email or username belongs to another user.
+    Both are checked with a single query.
+    """
+    conditions = []
+    new_email = user_in.email if user_in.email and user_in.email != current_user.email else None
+    new_username = user_in.username if user_in.username and user_in.username != current_user.username else None
+    if new_email:
+        conditions.append(User.email == new_email)
+    if new_username:
+        conditions.append(User.username == new_username)
+    if not conditions:
+        return
+    
+    rows = (await db.execute(
+        select(User.id, User.email, User.username).where(or_(*conditions))
+    )).all()
+    rows = [row for row in rows if row.id != current_user.id]
+    if new_email and any(row.email == new_email for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    if new_username and any(row.username == new_username for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already taken"
+        )
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
@@ -21,150 +84,80 @@ def read_user_me(
     Get current user profile WITH host application status included!
     NO MORE ADDITIONAL API CALLS NEEDED! 🚀
     """
-    print(f"USER ME DEBUG: Returning user with host status: {current_user.host_application_status}")
-    return current_user
+    # Keyed by user id, so one user's cached profile is never served to another
+    cache_key = user_profile_cache_key(current_user.id)
+    payload = query_cache.get(cache_key)
+    if payload is None:
+        logger.debug("USER ME: serializing user with host status %s", current_user.host_application_status)
+        # by_alias matches what FastAPI's response_model serialization emits
+        payload = UserSchema.from_orm_fast(current_user).model_dump_json(by_alias=True)
+        query_cache.set(cache_key, payload, USER_PROFILE_CACHE_TTL)
+    return Response(content=payload, media_type="application/json")
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserUpdate,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Update current user profile
     """
-    print(f"UPDATE USER DEBUG: Received data: {user_in.dict(exclude_unset=True)}")
+    await _check_email_username_available(db, user_in, current_user)
     
-    if user_in.email and user_in.email != current_user.email:
-        user = db.query(User).filter(User.email == user_in.email).first()
-        if user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    if user_in.username and user_in.username != current_user.username:
-        user = db.query(User).filter(User.username == user_in.username).first()
-        if user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-    
-    # Update user fields
-    update_data = user_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        if field == "password" and value:
-            value = get_password_hash(value)
-        # Handle camelCase to snake_case conversion if needed
-        if field == "fullName":
-            setattr(current_user, "full_name", value)
-        elif field == "zipCode":
-            setattr(current_user, "zip_code", value)
-        elif field == "avatarUrl":
-            setattr(current_user, "avatar_url", value)
-        else:
-            setattr(current_user, field, value)
+    update_data = user_in.model_dump(exclude_unset=True)
+    logger.debug("UPDATE USER: user %s fields %s", current_user.id, list(update_data))
+    await _apply_user_update(current_user, update_data)
     
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    print(f"UPDATE USER DEBUG: User updated successfully. Avatar URL: {current_user.avatar_url}")
+    await db.commit()
+    await db.refresh(current_user)
+    await _invalidate_profile_caches(current_user)
+    logger.debug("UPDATE USER: user %s updated", current_user.id)
     return current_user
 
 @router.patch("/me", response_model=UserSchema)
-def patch_user_me(
+async def patch_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserUpdate,
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Update current user profile (PATCH version) - Handles avatar_url updates
     """
-    print(f"PATCH USER DEBUG: Received data: {user_in.dict(exclude_unset=True)}")
-    
-    # Check for email conflicts only if email is being updated
-    if user_in.email and user_in.email != current_user.email:
-        existing_user = db.query(User).filter(User.email == user_in.email).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Check for username conflicts only if username is being updated
-    if user_in.username and user_in.username != current_user.username:
-        existing_user = db.query(User).filter(User.username == user_in.username).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-    
-    # Update user fields - handle both camelCase and snake_case
-    update_data = user_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        if field == "password" and value:
-            # Hash password if provided
-            value = get_password_hash(value)
-            setattr(current_user, field, value)
-        elif field == "fullName":
-            # Handle camelCase from frontend
-            setattr(current_user, "full_name", value)
-        elif field == "zipCode":
-            # Handle camelCase from frontend
-            setattr(current_user, "zip_code", value)
-        elif field == "avatarUrl":
-            # Handle camelCase from frontend
-            setattr(current_user, "avatar_url", value)
-            print(f"PATCH USER DEBUG: Setting avatar_url to: {value}")
-        elif field in ["full_name", "zip_code", "avatar_url"]:
-            # Handle snake_case directly
-            setattr(current_user, field, value)
-            if field == "avatar_url":
-                print(f"PATCH USER DEBUG: Setting avatar_url (snake_case) to: {value}")
-        else:
-            # Handle other fields directly
-            setattr(current_user, field, value)
+    # Check for email/username conflicts only for fields being updated
+    await _check_email_username_available(db, user_in, current_user)
     
-    # Special handling for avatar_url removal (when set to null/None)
-    if "avatar_url" in update_data and update_data["avatar_url"] is None:
-        current_user.avatar_url = None
-        print(f"PATCH USER DEBUG: Avatar URL removed (set to None)")
-    elif "avatarUrl" in update_data and update_data["avatarUrl"] is None:
-        current_user.avatar_url = None
-        print(f"PATCH USER DEBUG: Avatar URL removed via camelCase (set to None)")
+    update_data = user_in.model_dump(exclude_unset=True)
+    logger.debug("PATCH USER: user %s fields %s", current_user.id, list(update_data))
+    await _apply_user_update(current_user, update_data)
     
     # Update the updated_at timestamp
     current_user.updated_at = func.now()
     
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    await _invalidate_profile_caches(current_user)
     
-    print(f"PATCH USER DEBUG: User updated successfully. Final avatar_url: {current_user.avatar_url}")
+    logger.debug("PATCH USER: user %s updated", current_user.id)
     return current_user
 
 @router.post("/apply-host", response_model=HostApplicationSchema)
 async def apply_for_host(
     application_in: HostApplicationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     User applies to become a host/owner with enhanced fields including bio and documents.
     NOW OPTIMIZED: Uses host_application_status from user table for instant checks!
     """
-    print("=" * 50)
-    print("APPLY HOST DEBUG: OPTIMIZED VERSION")
-    print(f"APPLY HOST DEBUG: User: {current_user.email}")
-    print(f"APPLY HOST DEBUG: Current host status: {current_user.host_application_status}")
-    
     # FAST CHECK: Use the new column instead of querying host_applications table
     if current_user.host_application_status:
-        print(f"APPLY HOST DEBUG: User already has status: {current_user.host_application_status}")
+        logger.debug("APPLY HOST: user %s already has status %s", current_user.id, current_user.host_application_status)
         if current_user.host_application_status == ApplicationStatus.PENDING:
             raise HTTPException(status_code=400, detail="You already have a pending application.")
         elif current_user.host_application_status == "approved":
@@ -179,45 +172,54 @@ async def apply_for_host(
             address=application_in.address,
             bio=application_in.bio,
             status=ApplicationStatus.PENDING,
-            verification_documents=json.dumps(application_in.document_urls)
+            verification_documents=application_in.document_urls
         )
         
         db.add(application)
-        db.commit()
-        db.refresh(application)
         
-        # UPDATE USER TABLE: Set the status and ID
+        # UPDATE USER TABLE: Set the status in the same transaction as the insert
         current_user.host_application_status = ApplicationStatus.PENDING
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        # Picks up server defaults (id, created_at) for the response
+        await db.refresh(application)
+        await invalidate_user_cache(current_user.id)
         
-        print(f"APPLY HOST DEBUG: Application created and user updated - Status: {current_user.host_application_status}")
-        print("=" * 50)
+        logger.debug("APPLY HOST: application %s created for user %s", application.id, current_user.id)
         
         return application
         
     except Exception as e:
-        print(f"APPLY HOST DEBUG: Error creating application: {e}")
-        db.rollback()
+        logger.exception("APPLY HOST: error creating application for user %s", current_user.id)
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create application: {str(e)}")
 
 @router.get("/host-applications", response_model=List[HostApplicationSchema])
 async def list_host_applications(
-    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Admin: List all host applications.
+    Admin: List host applications, newest first.
+    The response schema has no user fields, so the applicant is never loaded.
     """
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return db.query(HostApplication).all()
+    result = await db.execute(
+        select(HostApplication)
+        .options(*list_load_options())
+        .order_by(HostApplication.id.desc())
+        .offset(skip)
+        .limit(min(limit, MAX_HOST_APPLICATIONS_PAGE))
+    )
+    return result.scalars().all()
 
 @router.post("/host-applications/{application_id}/review", response_model=HostApplicationSchema)
 async def review_host_application(
     application_id: int,
     review: HostApplicationReview,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -227,30 +229,47 @@ async def review_host_application(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    application = db.query(HostApplication).filter(HostApplication.id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-    if application.status != ApplicationStatus.PENDING:
-        raise HTTPException(status_code=400, detail="Application already reviewed")
-    if review.status not in [ApplicationStatus.APPROVED, ApplicationStatus.REJECTED]:
+    if review.status not in REVIEWED_APPLICATION_STATUSES:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    # Update application
-    application.status = review.status
-    application.reviewed_at = func.now()
-    application.admin_comment = review.admin_comment
+    # Update application in one UPDATE ... RETURNING; the PENDING check is part
+    # of the WHERE so an already-reviewed application simply matches no row
+    application = (await db.execute(
+        update(HostApplication)
+        .where(
+            HostApplication.id == application_id,
+            HostApplication.status == ApplicationStatus.PENDING,
+        )
+        .values(
+            status=review.status,
+            reviewed_at=func.now(),
+            admin_comment=review.admin_comment,
+        )
+        .returning(HostApplication)
+    )).scalar_one_or_none()
+    if not application:
+        exists = (await db.execute(
+            select(HostApplication.id).where(HostApplication.id == application_id)
+        )).scalar_one_or_none()
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Application not found")
+        raise HTTPException(status_code=400, detail="Application already reviewed")
     
     # UPDATE USER TABLE: Set the new status
-    user = db.query(User).filter(User.id == application.user_id).first()
-    if user:
-        user.host_application_status = review.status
-        if review.status == ApplicationStatus.APPROVED:
-            user.role = "provider"  # Promote to provider
-        
-    db.commit()
-    db.refresh(application)
+    user_values = {"host_application_status": review.status}
+    if review.status == ApplicationStatus.APPROVED:
+        user_values["role"] = "provider"  # Promote to provider
+    user_email = (await db.execute(
+        update(User)
+        .where(User.id == application.user_id)
+        .values(**user_values)
+        .returning(User.email)
+    )).scalar_one_or_none()
+    
+    await db.commit()
+    await invalidate_user_cache(application.user_id)
     
-    print(f"REVIEW DEBUG: Updated user {user.email} status to {user.host_application_status}")
+    logger.info("REVIEW: updated user %s status to %s", user_email, review.status)
     
     return application
 
@@ -260,25 +279,20 @@ async def review_host_application(
 @router.post("/sync-profile", response_model=UserSchema)
 async def sync_profile(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     supabase_user = Depends(get_supabase_user),
 ) -> Any:
     """
     Ensure a user profile exists for the authenticated Supabase user. If not, create it.
     """
-    print("=" * 50)
-    print("SYNC PROFILE DEBUG: ENDPOINT CALLED")
-    print("SYNC PROFILE DEBUG: supabase_user:", supabase_user.email)
-    
     try:
         data = await request.json()
-        print("SYNC PROFILE DEBUG: Request data:", data)
     except Exception as e:
-        print("SYNC PROFILE DEBUG: Error reading request data:", e)
+        logger.debug("SYNC PROFILE: invalid request body: %s", e)
         raise HTTPException(status_code=400, detail="Invalid JSON data")
     
     # Check if user exists by email from Supabase user
-    existing_user = db.query(User).filter(User.email == supabase_user.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == supabase_user.email))).scalar_one_or_none()
     
     if existing_user:
         return existing_user
@@ -290,16 +304,18 @@ async def sync_profile(
     if not username or not full_name:
         raise HTTPException(status_code=400, detail="Username and full name are required")
     
-    # Check if username is already taken
-    existing_username = db.query(User).filter(User.username == username).first()
+    # Check if username is already taken - fetch every username sharing the
+    # prefix in one query and pick the first free numeric suffix locally
+    taken = set((await db.execute(
+        select(User.username).where(User.username.startswith(username, autoescape=True))
+    )).scalars())
     
-    if existing_username:
+    if username in taken:
         base_username = username
         counter = 1
-        while existing_username:
-            username = f"{base_username}{counter}"
-            existing_username = db.query(User).filter(User.username == username).first()
+        while f"{base_username}{counter}" in taken:
             counter += 1
+        username = f"{base_username}{counter}"
     
     try:
         user = User(
@@ -323,26 +339,26 @@ async def sync_profile(
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
-        print("SYNC PROFILE DEBUG: SUCCESS - User created")
-        print("=" * 50)
+        logger.info("SYNC PROFILE: created user %s", user.id)
         return user
         
     except Exception as e:
-        print(f"SYNC PROFILE DEBUG: ERROR creating user: {e}")
-        db.rollback()
+        logger.exception("SYNC PROFILE: error creating user")
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create user: {str(e)}")
 
 # Standard user CRUD operations remain the same...
 
 @router.get("/", response_model=List[UserSchema])
-def read_users(
+async def read_users(
     skip: int = 0,
     limit: int = 100,
+    after_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Retrieve users
@@ -352,38 +368,48 @@ def read_users(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    # Both paging modes use id order, so a client can pass the last id of an
+    # offset page as after_id and continue without skipping or repeating rows
+    query = select(User).options(*list_load_options()).order_by(User.id)
+    if after_id is not None:
+        # Keyset pagination on the primary key instead of scanning past `skip` rows
+        query = query.where(User.id > after_id)
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    users = result.scalars().all()
+    # Serialized directly; returning models would make FastAPI dump and re-validate each one
+    return Response(content=serialize_users(users), media_type="application/json")
 
 @router.get("/{user_id}", response_model=UserSchema)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Get a specific user by id
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    if user == current_user:
-        return user
+    if user_id == current_user.id:
+        return current_user
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     return user
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Delete a user
@@ -393,12 +419,14 @@ def delete_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    user = db.query(User).filter(User.id == user_id).first()
+    # db.get checks the identity map first (current_user is already in it)
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await invalidate_user_cache(user_id)
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Any, List, Tuple
 from app.core.security import get_current_user
-from app.db.session import get_db
+from app.db.session import get_db, list_load_options
 from app.models.user import User
 from app.models.property import Property
 from app.models.enums import PropertyStatus
@@ -12,6 +13,8 @@ from app.schemas.wishlists import (
     WishlistCreate
 )
 from app.core.cache import cached_query, invalidate_wishlist_cache
+import hashlib
+import orjson
 
 router = APIRouter()
 
@@ -25,26 +28,28 @@ def add_to_wishlist(
     """
     Add a property to user's wishlist
     """
-    # Check if property exists and is approved
-    property_obj = db.query(Property).filter(
-        Property.id == wishlist_in.property_id,
-        Property.status == PropertyStatus.APPROVED,
-        Property.is_listed == True
-    ).first()
+    # Property availability and the duplicate check as two EXISTS probes in one query
+    property_available, already_saved = db.execute(
+        select(
+            exists().where(
+                Property.id == wishlist_in.property_id,
+                Property.status == PropertyStatus.APPROVED,
+                Property.is_listed == True
+            ),
+            exists().where(
+                Wishlist.user_id == current_user.id,
+                Wishlist.property_id == wishlist_in.property_id
+            ),
+        )
+    ).one()
     
-    if not property_obj:
+    if not property_available:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Property not found or not available"
         )
     
-    # Check if already in wishlist
-    existing = db.query(Wishlist).filter(
-        Wishlist.user_id == current_user.id,
-        Wishlist.property_id == wishlist_in.property_id
-    ).first()
-    
-    if existing:
+    if already_saved:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Property already in wishlist"
@@ -64,29 +69,40 @@ def add_to_wishlist(
     
     return wishlist
 
-@cached_query(ttl=300, cache_key_prefix="wishlists")
+@cached_query(ttl=300, cache_key_prefix="wishlists", user_key_arg="user_id")
 def _get_user_wishlists_cached(
     db: Session,
     user_id: int,
     skip: int = 0,
     limit: int = 100,
-) -> List[Wishlist]:
+) -> Tuple[str, bytes]:
     """
     Cached function to get user's wishlist with optimized joins
+    Returns (etag, body): the serialized response payload, so the cache never
+    holds ORM objects, and an ETag hashed from that exact payload
     """
     wishlists = db.query(Wishlist).options(
-        joinedload(Wishlist.property).joinedload(Property.provider)
+        # One IN query for the page's properties (with their provider joined)
+        # instead of widening every wishlist row with property + user columns
+        selectinload(Wishlist.property).joinedload(Property.provider),
+        *list_load_options()
     ).filter(
         Wishlist.user_id == user_id
     ).order_by(
         Wishlist.created_at.desc()  # Most recent first
     ).offset(skip).limit(limit).all()
     
-    return wishlists
+    # by_alias matches what FastAPI's response_model serialization emits
+    body = orjson.dumps([
+        WishlistResponse.from_orm_fast(wishlist).model_dump(mode="json", by_alias=True)
+        for wishlist in wishlists
+    ])
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"', body
 
 @router.get("/", response_model=List[WishlistResponse])
 def get_my_wishlists(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = 0,
@@ -95,14 +111,20 @@ def get_my_wishlists(
     """
     Get current user's wishlist with property details
     """
-    wishlists = _get_user_wishlists_cached(
+    etag, body = _get_user_wishlists_cached(
         db=db,
         user_id=current_user.id,
         skip=skip,
         limit=limit
     )
     
-    return wishlists
+    # Conditional GET: the ETag is cached with the body it describes, so a
+    # 304 never vouches for a different payload than a 200 would send
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Already serialized (and cached that way); skip response_model re-validation
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.delete("/{property_id}")
 def remove_from_wishlist(
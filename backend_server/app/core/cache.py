@@ -1,35 +1,74 @@
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Dict, Optional, Callable, Set, Tuple
+import inspect
 import time
 import hashlib
-import json
+import hmac
+import logging
+import pickle
+import threading
 from datetime import datetime, timedelta
+import orjson
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis is optional; without it the in-process cache is used
+    redis = None
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
 
 class InMemoryCache:
-    def __init__(self, default_ttl: int = 300):  # 5 minutes default
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    # Entries live in this process only: an invalidation on one worker
+    # doesn't reach the copies other workers hold
+    shared = False
+    
+    def __init__(self, default_ttl: int = 300, max_entries: int = 10_000):  # 5 minutes default
+        # Kept in least-recently-used order so the size cap evicts from the front
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+        # namespace -> keys stored under it, so a namespace can be dropped without a full scan
+        self._namespaces: Dict[str, Set[str]] = {}
+        # Sync endpoints call in from threadpool threads while the sweep runs
+        # on the event loop, so every read-modify-write holds this
+        self._lock = threading.Lock()
         self.default_ttl = default_ttl
     
     def _generate_key(self, func_name: str, args: tuple, kwargs: dict) -> str:
         """Generate a cache key from function name and arguments"""
+        # DB sessions differ on every request, so they must not be part of the key
+        args = tuple(a for a in args if not isinstance(a, (Session, AsyncSession)))
+        kwargs = {
+            k: v for k, v in kwargs.items()
+            if k != 'db' and not isinstance(v, (Session, AsyncSession))
+        }
         # Convert args and kwargs to a string representation
         key_data = {
             'func': func_name,
             'args': args,
             'kwargs': sorted(kwargs.items())
         }
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        return hashlib.md5(key_str.encode()).hexdigest()
+        # str() fallback covers types orjson can't encode natively (e.g. Decimal)
+        key_bytes = orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS, default=str)
+        # Keep the readable function name in front so prefix invalidation can match it
+        return f"{func_name}:{hashlib.blake2b(key_bytes, digest_size=16).hexdigest()}"
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
-        if key in self._cache:
-            entry = self._cache[key]
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
             if time.time() < entry['expires_at']:
+                self._cache.move_to_end(key)
                 return entry['value']
-            else:
-                # Remove expired entry
-                del self._cache[key]
+            # Remove expired entry
+            del self._cache[key]
         return None
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
@@ -37,82 +76,450 @@ class InMemoryCache:
         if ttl is None:
             ttl = self.default_ttl
         
-        self._cache[key] = {
+        now = time.time()
+        entry = {
             'value': value,
-            'expires_at': time.time() + ttl,
-            'created_at': time.time()
+            'expires_at': now + ttl,
+            'created_at': now
         }
+        with self._lock:
+            self._set_locked(key, entry)
+    
+    def _set_locked(self, key: str, entry: Dict[str, Any]) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
     
     def delete(self, key: str) -> None:
         """Delete key from cache"""
-        if key in self._cache:
-            del self._cache[key]
+        with self._lock:
+            self._cache.pop(key, None)
+    
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete every key starting with prefix"""
+        with self._lock:
+            for key in [key for key in self._cache if key.startswith(prefix)]:
+                del self._cache[key]
+            for namespace in [ns for ns in self._namespaces if ns.startswith(prefix)]:
+                del self._namespaces[namespace]
+    
+    def get_in(self, namespace: str, key: str) -> Optional[Any]:
+        """Get a value stored under a namespace"""
+        return self.get(f"{namespace}:{key}")
+    
+    def set_in(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Set a value under a namespace so delete_namespace can drop it"""
+        if ttl is None:
+            ttl = self.default_ttl
+        full_key = f"{namespace}:{key}"
+        now = time.time()
+        entry = {'value': value, 'expires_at': now + ttl, 'created_at': now}
+        with self._lock:
+            self._set_locked(full_key, entry)
+            self._namespaces.setdefault(namespace, set()).add(full_key)
+    
+    def delete_namespace(self, namespace: str) -> None:
+        """Delete every value stored under a namespace"""
+        with self._lock:
+            for key in self._namespaces.pop(namespace, ()):
+                self._cache.pop(key, None)
+    
+    # Awaitable forms of the methods above, so async code has one interface
+    # for both backends. Nothing here does I/O, so they call straight through.
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+    
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.set(key, value, ttl)
+    
+    async def adelete(self, key: str) -> None:
+        self.delete(key)
+    
+    async def adelete_prefix(self, prefix: str) -> None:
+        self.delete_prefix(prefix)
+    
+    async def aget_in(self, namespace: str, key: str) -> Optional[Any]:
+        return self.get_in(namespace, key)
+    
+    async def aset_in(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.set_in(namespace, key, value, ttl)
+    
+    async def adelete_namespace(self, namespace: str) -> None:
+        self.delete_namespace(namespace)
     
     def clear(self) -> None:
         """Clear all cache entries"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._namespaces.clear()
     
     def cleanup_expired(self) -> None:
         """Remove expired entries from cache"""
         current_time = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if current_time >= entry['expires_at']
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+        with self._lock:
+            expired_keys = [
+                key for key, entry in self._cache.items()
+                if current_time >= entry['expires_at']
+            ]
+            for key in expired_keys:
+                del self._cache[key]
+            # Also forgets keys the size cap evicted
+            for namespace, keys in list(self._namespaces.items()):
+                keys.intersection_update(self._cache)
+                if not keys:
+                    del self._namespaces[namespace]
+
+_SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+class RedisCache:
+    """
+    Redis-backed cache shared by all workers, with the same interface as
+    InMemoryCache. Async code must use the a* methods, which go through
+    redis.asyncio; the plain methods use a blocking client and are only for
+    sync endpoints (which FastAPI runs in its threadpool).
+    Every key is stored under key_prefix, so SCANs and clear() never touch
+    keys that belong to anything else in the same Redis database.
+    While Redis is unreachable it falls back to a local InMemoryCache and
+    retries Redis after a short back-off.
+    """
+    RETRY_AFTER = 30  # seconds to skip Redis after a connection error
+    SCAN_COUNT = 500
+    
+    def __init__(
+        self,
+        client: "redis.Redis",
+        async_client: "redis_asyncio.Redis",
+        key_prefix: str,
+        signing_key: bytes,
+        default_ttl: int = 300,
+    ):
+        self._signing_key = signing_key
+        self._redis = client
+        self._aredis = async_client
+        self._prefix = key_prefix
+        self._fallback = InMemoryCache(default_ttl)
+        self._retry_at = 0.0
+        self.default_ttl = default_ttl
+    
+    _generate_key = InMemoryCache._generate_key
+    
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+    
+    # Values are pickled so cached rows keep their types (datetimes, enums,
+    # tuples). Unpickling runs code, so each value carries an HMAC and
+    # anything Redis returns unsigned or tampered is treated as a miss.
+    def _dumps(self, value: Any) -> bytes:
+        payload = pickle.dumps(value)
+        return hmac.new(self._signing_key, payload, hashlib.sha256).digest() + payload
+    
+    def _loads(self, raw: bytes) -> Optional[Any]:
+        signature, payload = raw[:_SIGNATURE_SIZE], raw[_SIGNATURE_SIZE:]
+        expected = hmac.new(self._signing_key, payload, hashlib.sha256).digest()
+        if not hmac.compare_digest(signature, expected):
+            logger.warning("Discarding cache value with a bad signature")
+            return None
+        return pickle.loads(payload)
+    
+    @property
+    def shared(self) -> bool:
+        """False while writes are going to the per-process fallback"""
+        return self._available()
+    
+    def _available(self) -> bool:
+        return time.time() >= self._retry_at
+    
+    def _failed(self, e: Exception) -> None:
+        logger.warning("Redis cache unavailable, using in-memory fallback: %s", e)
+        self._retry_at = time.time() + self.RETRY_AFTER
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache if not expired"""
+        if self._available():
+            try:
+                raw = self._redis.get(self._key(key))
+                return self._loads(raw) if raw is not None else None
+            except redis.RedisError as e:
+                self._failed(e)
+        return self._fallback.get(key)
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        if self._available():
+            try:
+                raw = await self._aredis.get(self._key(key))
+                return self._loads(raw) if raw is not None else None
+            except redis.RedisError as e:
+                self._failed(e)
+        return self._fallback.get(key)
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Set value in cache with TTL"""
+        if ttl is None:
+            ttl = self.default_ttl
+        if self._available():
+            try:
+                self._redis.set(self._key(key), self._dumps(value), ex=ttl)
+                return
+            except redis.RedisError as e:
+                self._failed(e)
+        self._fallback.set(key, value, ttl)
+    
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        if ttl is None:
+            ttl = self.default_ttl
+        if self._available():
+            try:
+                await self._aredis.set(self._key(key), self._dumps(value), ex=ttl)
+                return
+            except redis.RedisError as e:
+                self._failed(e)
+        self._fallback.set(key, value, ttl)
+    
+    def delete(self, key: str) -> None:
+        """Delete key from cache"""
+        self._fallback.delete(key)
+        if self._available():
+            try:
+                self._redis.delete(self._key(key))
+            except redis.RedisError as e:
+                self._failed(e)
+    
+    async def adelete(self, key: str) -> None:
+        self._fallback.delete(key)
+        if self._available():
+            try:
+                await self._aredis.delete(self._key(key))
+            except redis.RedisError as e:
+                self._failed(e)
+    
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete every key starting with prefix (SCAN, not the blocking KEYS)"""
+        self._fallback.delete_prefix(prefix)
+        if self._available():
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for key in self._redis.scan_iter(match=f"{self._key(prefix)}*", count=self.SCAN_COUNT):
+                    pipe.delete(key)
+                pipe.execute()
+            except redis.RedisError as e:
+                self._failed(e)
+    
+    async def adelete_prefix(self, prefix: str) -> None:
+        self._fallback.delete_prefix(prefix)
+        if self._available():
+            try:
+                pipe = self._aredis.pipeline(transaction=False)
+                async for key in self._aredis.scan_iter(match=f"{self._key(prefix)}*", count=self.SCAN_COUNT):
+                    pipe.delete(key)
+                await pipe.execute()
+            except redis.RedisError as e:
+                self._failed(e)
+    
+    def get_in(self, namespace: str, key: str) -> Optional[Any]:
+        """Get a field of the namespace's Redis hash"""
+        if self._available():
+            try:
+                raw = self._redis.hget(self._key(namespace), key)
+                return self._loads(raw) if raw is not None else None
+            except redis.RedisError as e:
+                self._failed(e)
+        return self._fallback.get_in(namespace, key)
+    
+    async def aget_in(self, namespace: str, key: str) -> Optional[Any]:
+        if self._available():
+            try:
+                raw = await self._aredis.hget(self._key(namespace), key)
+                return self._loads(raw) if raw is not None else None
+            except redis.RedisError as e:
+                self._failed(e)
+        return self._fallback.get_in(namespace, key)
+    
+    def set_in(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Set a field of the namespace's Redis hash. Redis expires whole hashes,
+        so the namespace lives for ttl after its most recent write.
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        if self._available():
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                pipe.hset(self._key(namespace), key, self._dumps(value))
+                pipe.expire(self._key(namespace), ttl)
+                pipe.execute()
+                return
+            except redis.RedisError as e:
+                self._failed(e)
+        self._fallback.set_in(namespace, key, value, ttl)
+    
+    async def aset_in(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        if ttl is None:
+            ttl = self.default_ttl
+        if self._available():
+            try:
+                pipe = self._aredis.pipeline(transaction=False)
+                pipe.hset(self._key(namespace), key, self._dumps(value))
+                pipe.expire(self._key(namespace), ttl)
+                await pipe.execute()
+                return
+            except redis.RedisError as e:
+                self._failed(e)
+        self._fallback.set_in(namespace, key, value, ttl)
+    
+    def delete_namespace(self, namespace: str) -> None:
+        """Delete every value stored under a namespace with a single DEL"""
+        self._fallback.delete_namespace(namespace)
+        if self._available():
+            try:
+                self._redis.delete(self._key(namespace))
+            except redis.RedisError as e:
+                self._failed(e)
+    
+    async def adelete_namespace(self, namespace: str) -> None:
+        self._fallback.delete_namespace(namespace)
+        if self._available():
+            try:
+                await self._aredis.delete(self._key(namespace))
+            except redis.RedisError as e:
+                self._failed(e)
+    
+    def clear(self) -> None:
+        """Clear this cache's entries (only keys under its prefix)"""
+        self._fallback.clear()
+        self.delete_prefix("")
+    
+    def cleanup_expired(self) -> None:
+        """Remove expired entries from cache (Redis expires its own keys)"""
+        self._fallback.cleanup_expired()
+
+def _create_cache(default_ttl: int):
+    if redis is not None and settings.REDIS_HOST:
+        if not settings.CACHE_SIGNING_KEY:
+            logger.warning("REDIS_HOST is set but CACHE_SIGNING_KEY is not; using the in-process cache")
+            return InMemoryCache(default_ttl)
+        connection = dict(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+        return RedisCache(
+            redis.Redis(**connection),
+            redis_asyncio.Redis(**connection),
+            settings.CACHE_KEY_PREFIX,
+            settings.CACHE_SIGNING_KEY.encode(),
+            default_ttl,
+        )
+    return InMemoryCache(default_ttl)
 
 # Global cache instance
-query_cache = InMemoryCache(default_ttl=300)  # 5 minutes
+query_cache = _create_cache(default_ttl=300)  # 5 minutes
 
-def cached_query(ttl: int = 300, cache_key_prefix: str = ""):
-    """Decorator for caching database query results"""
+def user_cache_namespace(prefix: str, user_id: int) -> str:
+    """Namespace holding one user's entries for a cached_query prefix"""
+    return f"{prefix}:user:{user_id}"
+
+def cached_query(ttl: int = 300, cache_key_prefix: str = "", user_key_arg: Optional[str] = None):
+    """
+    Decorator for caching database query results.
+    With user_key_arg, entries are grouped per user (by that argument's value)
+    so invalidating one user's entries is a single namespace delete.
+    """
     def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        
+        def lookup(args: tuple, kwargs: dict) -> Tuple[Optional[str], str]:
+            """(namespace, key) for a call; namespace is None unless user_key_arg is set"""
+            func_name = f"{cache_key_prefix}_{func.__name__}" if cache_key_prefix else func.__name__
+            if user_key_arg is None:
+                return None, query_cache._generate_key(func_name, args, kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            user_id = bound.arguments.pop(user_key_arg)
+            namespace = user_cache_namespace(cache_key_prefix or func.__name__, user_id)
+            return namespace, query_cache._generate_key(func_name, (), bound.arguments)
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                namespace, key = lookup(args, kwargs)
+                
+                if namespace is None:
+                    cached_result = await query_cache.aget(key)
+                else:
+                    cached_result = await query_cache.aget_in(namespace, key)
+                if cached_result is not None:
+                    return cached_result
+                
+                result = await func(*args, **kwargs)
+                if namespace is None:
+                    await query_cache.aset(key, result, ttl)
+                else:
+                    await query_cache.aset_in(namespace, key, result, ttl)
+                return result
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Generate cache key
-            func_name = f"{cache_key_prefix}_{func.__name__}" if cache_key_prefix else func.__name__
-            cache_key = query_cache._generate_key(func_name, args, kwargs)
+            namespace, key = lookup(args, kwargs)
             
             # Try to get from cache
-            cached_result = query_cache.get(cache_key)
+            if namespace is None:
+                cached_result = query_cache.get(key)
+            else:
+                cached_result = query_cache.get_in(namespace, key)
             if cached_result is not None:
                 return cached_result
             
             # Execute function and cache result
             result = func(*args, **kwargs)
-            query_cache.set(cache_key, result, ttl)
+            if namespace is None:
+                query_cache.set(key, result, ttl)
+            else:
+                query_cache.set_in(namespace, key, result, ttl)
             return result
         
         return wrapper
     return decorator
 
-def invalidate_cache_pattern(pattern: str) -> None:
-    """Invalidate cache entries matching a pattern"""
-    keys_to_delete = []
-    for key in query_cache._cache.keys():
-        if pattern in key:
-            keys_to_delete.append(key)
-    
-    for key in keys_to_delete:
-        query_cache.delete(key)
+def property_cache_key(property_id: int) -> str:
+    """Cache key for a single property detail response"""
+    return f"property:{property_id}"
 
-# Cache invalidation helpers
-def invalidate_property_cache(property_id: Optional[int] = None) -> None:
-    """Invalidate property-related cache entries"""
+# Cache invalidation helpers. The async ones are for async endpoints, so
+# Redis round-trips never block the event loop.
+async def invalidate_property_cache(property_id: Optional[int] = None) -> None:
+    """
+    Invalidate property-related cache entries, including every user's cached
+    wishlist pages, which embed property (and provider) details
+    """
     if property_id:
-        invalidate_cache_pattern(f"property_{property_id}")
-    invalidate_cache_pattern("properties_list")
-    invalidate_cache_pattern("get_approved_properties")
+        await query_cache.adelete(property_cache_key(property_id))
+    else:
+        # No single property: drop every cached detail (each embeds its provider)
+        await query_cache.adelete_prefix("property:")
+    await query_cache.adelete_prefix("properties_list")
+    await query_cache.adelete_prefix("wishlists:")
 
 def invalidate_wishlist_cache(user_id: Optional[int] = None) -> None:
-    """Invalidate wishlist-related cache entries"""
+    """Invalidate wishlist-related cache entries (one user's, or everyone's)"""
     if user_id:
-        invalidate_cache_pattern(f"wishlist_{user_id}")
-    invalidate_cache_pattern("wishlists")
+        query_cache.delete_namespace(user_cache_namespace("wishlists", user_id))
+    else:
+        query_cache.delete_prefix("wishlists:")
+
+def user_cache_key(user_id: int) -> str:
+    """Cache key for a user's row as cached by the auth dependency"""
+    return f"user:{user_id}"
 
-def invalidate_user_cache(user_id: Optional[int] = None) -> None:
+def user_profile_cache_key(user_id: int) -> str:
+    """Cache key for a user's serialized /users/me response"""
+    return f"user:profile:{user_id}"
+
+async def invalidate_user_cache(user_id: int) -> None:
     """Invalidate user-related cache entries"""
-    if user_id:
-        invalidate_cache_pattern(f"user_{user_id}")
-    invalidate_cache_pattern("users")
\ No newline at end of file
+    await query_cache.adelete(user_cache_key(user_id))
+    await query_cache.adelete(user_profile_cache_key(user_id))
@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     # Supabase
     SUPABASE_URL: str
     SUPABASE_KEY: str
+    # Legacy HS256 signing secret; when set, HS256 tokens are verified locally
+    SUPABASE_JWT_SECRET: Optional[str] = None
     
     # Database
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
@@ -19,6 +21,43 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "hunting_lodges"
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
     
+    # Connection pools. The sync (get_db) and async (get_async_db) engines
+    # each keep their own pool, and a sync endpoint can hold one connection
+    # from each at once (get_current_user always uses the async session).
+    # The worst case per worker is therefore the sum of both budgets, 30
+    # with these defaults; size Postgres max_connections for workers x that.
+    DB_POOL_SIZE: int = 5  # sync engine
+    DB_MAX_OVERFLOW: int = 10
+    DB_ASYNC_POOL_SIZE: int = 5
+    DB_ASYNC_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 300  # seconds
+    # Off by default: the per-checkout SELECT 1 doubles round-trips on short
+    # requests; dead connections are caught by recycle + TCP keepalives instead
+    DB_POOL_PRE_PING: bool = False
+    DB_TCP_KEEPALIVES_IDLE: int = 30  # seconds
+    # Compiled-SQL cache entries per engine; large enough to hold every
+    # statement shape the API issues so steady state never recompiles
+    DB_QUERY_CACHE_SIZE: int = 1200
+    # Raise on any lazy relationship load in list endpoints (enable in dev/CI)
+    STRICT_LOADING: bool = False
+    # Create/upgrade tables at startup; turn off once the schema is current to
+    # skip the introspection queries on every worker start
+    AUTO_CREATE_TABLES: bool = True
+    
+    # Redis (shared cache); leave REDIS_HOST unset to use the in-process cache
+    REDIS_HOST: Optional[str] = None
+    REDIS_PORT: int = 6379
+    REDIS_PASSWORD: Optional[str] = None
+    # Prepended to every cache key, so invalidation scans stay inside this app's keys
+    CACHE_KEY_PREFIX: str = "huntproj:"
+    # HMAC key for cached values in Redis; required to use Redis at all, since
+    # values are pickled. Keep it secret and the same across workers.
+    CACHE_SIGNING_KEY: Optional[str] = None
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
@@ -32,4 +71,12 @@ class Settings(BaseSettings):
         return self.DATABASE_URL or self.SQLALCHEMY_DATABASE_URI or \
             f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
+    def get_async_database_uri(self):
+        """Same database as get_database_uri(), using the asyncpg driver"""
+        uri = self.get_database_uri()
+        scheme, sep, rest = uri.partition("://")
+        if scheme.split("+")[0] in ("postgres", "postgresql"):
+            return f"postgresql+asyncpg{sep}{rest}"
+        return uri
+
 settings = Settings() 
\ No newline at end of file
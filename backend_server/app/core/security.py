@@ -1,137 +1,293 @@
-from typing import Optional
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from gotrue.errors import AuthApiError
+from jose import JWTError, jwt
+from jose.exceptions import JWKError
+from sqlalchemy import bindparam, select, inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.cache import InMemoryCache, query_cache, user_cache_key
+from app.core.config import settings
 from app.core.supabase import supabase
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
+import hashlib
+import httpx
+import logging
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# New hashes use argon2 (argon2-cffi); existing bcrypt hashes still verify
+# and are reported by needs_update() as due for rehashing
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__rounds=3,
+    argon2__memory_cost=65536,
+    argon2__parallelism=4,
+)
+# Default (argon2) handler with the context's settings applied, resolved once.
+# verify_password still goes through the context: it must identify bcrypt hashes.
+_hash_password = pwd_context.handler().hash
 
 # Fixed OAuth2PasswordBearer configuration for Supabase tokens
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
+# Authenticated users are cached as plain column values, keyed by a hash of the
+# token, so most requests skip the users SELECT
+_USER_COLUMNS = tuple(attr.key for attr in sa_inspect(User).column_attrs)
+_AUTH_CACHE_MAX_TTL = 300  # seconds
+# The user snapshot carries role and is_active. Without a shared cache a
+# write only invalidates the worker that handled it, so other workers'
+# copies must expire quickly.
+_LOCAL_USER_SNAPSHOT_TTL = 10  # seconds
+# Built once so the auth miss path reuses one statement object (email is unique)
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+# Drop cached entries this long before the token's exp so a cached
+# verification never outlives the token (allows for clock skew)
+_AUTH_CACHE_EXPIRY_MARGIN = 10  # seconds
+
+def _token_cache_key(token: str) -> str:
+    # Never use the raw bearer token as a cache key
+    return f"token:{hashlib.sha256(token.encode()).hexdigest()}"
+
+def _token_cache_ttl(token: str) -> int:
+    """How long a token may stay cached: until just before its exp claim, capped"""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except Exception:
+        return 0
+    if not exp:
+        return 0
+    return max(0, min(_AUTH_CACHE_MAX_TTL, int(exp - time.time()) - _AUTH_CACHE_EXPIRY_MARGIN))
+
+# Tokens Supabase rejected (expired sessions, probes), kept per process and
+# briefly so a token that becomes valid isn't locked out for long. Separate
+# from query_cache so a flood of junk tokens can't evict real entries.
+_invalid_tokens = InMemoryCache(default_ttl=30, max_entries=5000)
+
+_JWKS_URL_PATH = "/auth/v1/.well-known/jwks.json"
+_JWKS_REFRESH_INTERVAL = 3600  # seconds
+_JWKS_MIN_REFETCH = 60  # seconds between refetches triggered by an unknown kid
+_ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+_jwks: Dict[str, Any] = {"keys": {}, "fetched_at": 0.0}
+
+async def _get_jwks_key(kid: Optional[str]) -> Optional[dict]:
+    """Signing key for kid from the project's JWKS, refreshed periodically"""
+    age = time.time() - _jwks["fetched_at"]
+    if age > _JWKS_REFRESH_INTERVAL or (kid not in _jwks["keys"] and age > _JWKS_MIN_REFETCH):
+        _jwks["fetched_at"] = time.time()
+        try:
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.get(f"{settings.SUPABASE_URL.rstrip('/')}{_JWKS_URL_PATH}")
+                response.raise_for_status()
+            _jwks["keys"] = {key.get("kid"): key for key in response.json().get("keys", [])}
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("Could not fetch Supabase JWKS: %s", e)
+    return _jwks["keys"].get(kid)
+
+async def _verify_token_locally(token: str) -> Optional[SimpleNamespace]:
+    """
+    Verify the token's signature, exp and audience without calling Supabase.
+    Returns a minimal user (id, email) from the claims, or None when the
+    token can't be checked locally and Supabase should decide.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm == "HS256" and settings.SUPABASE_JWT_SECRET:
+            key = settings.SUPABASE_JWT_SECRET
+        elif algorithm in _ASYMMETRIC_ALGORITHMS:
+            key = await _get_jwks_key(header.get("kid"))
+        else:
+            key = None
+        if key is None:
+            return None
+        claims = jwt.decode(token, key, algorithms=[algorithm], audience="authenticated")
+    # JWKError (a JWKS key jose can't construct) isn't a JWTError subclass
+    except (JWTError, JWKError):
+        return None
+    if not claims.get("sub") or not claims.get("email"):
+        return None
+    return SimpleNamespace(id=claims["sub"], email=claims["email"])
+
+async def _verify_token(token: str) -> Tuple[Any, Optional[int]]:
+    """
+    Verify a token, locally when possible, else with Supabase. Returns
+    (supabase_user, user_id), where supabase_user is None for an invalid
+    token and user_id is the matching users.id once it has been resolved.
+    Both live in one cache entry until the token expires, so repeat requests
+    skip the HTTP call to Supabase; rejected tokens are remembered briefly.
+    """
+    cache_key = _token_cache_key(token)
+    entry = await query_cache.aget(cache_key)
+    if entry is not None:
+        return entry
+    if _invalid_tokens.get(cache_key):
+        return None, None
+    supabase_user = await _verify_token_locally(token)
+    if supabase_user is None:
+        try:
+            # The client is synchronous, so keep its HTTP round-trip off the event loop
+            user_response = await run_in_threadpool(supabase.auth.get_user, token)
+        except AuthApiError:
+            user_response = None
+        if not user_response or not user_response.user:
+            _invalid_tokens.set(cache_key, True)
+            return None, None
+        supabase_user = user_response.user
+    ttl = _token_cache_ttl(token)
+    if ttl > 0:
+        await query_cache.aset(cache_key, (supabase_user, None), ttl)
+    return supabase_user, None
+
+async def _cache_user(token: str, supabase_user: Any, db_user: User) -> None:
+    ttl = _token_cache_ttl(token)
+    if ttl <= 0:
+        return
+    await query_cache.aset(_token_cache_key(token), (supabase_user, db_user.id), ttl)
+    await query_cache.aset(
+        user_cache_key(db_user.id),
+        {key: getattr(db_user, key) for key in _USER_COLUMNS},
+        _AUTH_CACHE_MAX_TTL if query_cache.shared else _LOCAL_USER_SNAPSHOT_TTL,
+    )
+
+async def _get_user(db: AsyncSession, token: str, supabase_user: Any, user_id: Optional[int]) -> Optional[User]:
+    """
+    Resolve the database user for a verified token: from the cached column
+    snapshot, else by primary key once the id is known, else by email.
+    """
+    if user_id is not None:
+        user_data = await query_cache.aget(user_cache_key(user_id))
+        if user_data is not None:
+            user = User(**user_data)
+            make_transient_to_detached(user)
+            # Attach to this request's session as a persistent object without a SELECT
+            return await db.merge(user, load=False)
+        db_user = await db.get(User, user_id)
+    else:
+        # IMPORTANT: Find by EMAIL, not by sub claim or ID
+        db_user = (await db.scalars(_USER_BY_EMAIL, {"email": supabase_user.email})).first()
+    if db_user:
+        await _cache_user(token, supabase_user, db_user)
+    return db_user
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return _hash_password(password)
+
+# Hashing is deliberately slow CPU work; argon2-cffi and bcrypt release the GIL,
+# so running them in the threadpool keeps the event loop free without a process pool
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password for async endpoints"""
+    return await run_in_threadpool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async endpoints"""
+    return await run_in_threadpool(get_password_hash, password)
+
+# Shared by every 401; the exception itself is still created per raise, since a
+# reused instance would accumulate tracebacks and be shared across requests
+_BEARER_CHALLENGE = {"WWW-Authenticate": "Bearer"}
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers=_BEARER_CHALLENGE,
+    )
 
 async def get_supabase_user(token: str = Depends(oauth2_scheme)):
     """
     Get Supabase user info from token without requiring database user to exist
     """
-    print(f"SUPABASE AUTH DEBUG: Received token: {token[:20] if token else 'None'}...")
+    logger.debug("SUPABASE AUTH DEBUG: Received token: %s...", token[:20] if token else 'None')
     
     if not token:
-        print("SUPABASE AUTH DEBUG: No token provided")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No authentication token provided",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.debug("SUPABASE AUTH DEBUG: No token provided")
+        raise _unauthorized("No authentication token provided")
     
     try:
-        print("SUPABASE AUTH DEBUG: Verifying token with Supabase...")
+        logger.debug("SUPABASE AUTH DEBUG: Verifying token with Supabase...")
         
         # Verify token with Supabase (this is the ONLY JWT verification you need)
-        user_response = supabase.auth.get_user(token)
+        supabase_user, _ = await _verify_token(token)
         
-        print(f"SUPABASE AUTH DEBUG: Supabase response: {user_response}")
+        logger.debug("SUPABASE AUTH DEBUG: Supabase user: %s", supabase_user)
         
-        if not user_response or not user_response.user:
-            print("SUPABASE AUTH DEBUG: Invalid token or no user in response")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        if not supabase_user:
+            logger.debug("SUPABASE AUTH DEBUG: Invalid token or no user in response")
+            raise _unauthorized("Could not validate credentials")
             
-        print(f"SUPABASE AUTH DEBUG: Successfully validated user: {user_response.user.email}")
-        return user_response.user
+        logger.debug("SUPABASE AUTH DEBUG: Successfully validated user: %s", supabase_user.email)
+        return supabase_user
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        print(f"SUPABASE AUTH DEBUG: Unexpected error: {e}")
-        print(f"SUPABASE AUTH DEBUG: Error type: {type(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Authentication error: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.warning("SUPABASE AUTH: unexpected error: %s: %s", type(e).__name__, e)
+        raise _unauthorized(f"Authentication error: {str(e)}")
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Get current user from token - requires user to exist in database
     """
-    print("🚀 USING CORRECT get_current_user FROM app.core.security 🚀")
-    print(f"GET_CURRENT_USER DEBUG: Received token: {token[:20] if token else 'None'}...")
+    logger.debug("GET_CURRENT_USER DEBUG: Received token: %s...", token[:20] if token else 'None')
     
     if not token:
-        print("GET_CURRENT_USER DEBUG: No token provided")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No authentication token provided",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.debug("GET_CURRENT_USER DEBUG: No token provided")
+        raise _unauthorized("No authentication token provided")
     
     try:
         # Only use Supabase for token verification
-        user_response = supabase.auth.get_user(token)
-        if not user_response or not user_response.user:
-            print("GET_CURRENT_USER DEBUG: Invalid token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        supabase_user, user_id = await _verify_token(token)
+        if not supabase_user:
+            logger.debug("GET_CURRENT_USER DEBUG: Invalid token")
+            raise _unauthorized("Could not validate credentials")
         
-        supabase_user = user_response.user
-        print(f"GET_CURRENT_USER DEBUG: Supabase user validated: {supabase_user.email}")
+        logger.debug("GET_CURRENT_USER DEBUG: Supabase user validated: %s", supabase_user.email)
         
-        # IMPORTANT: Find by EMAIL, not by sub claim or ID
-        print(f"GET_CURRENT_USER DEBUG: Looking for user by EMAIL: {supabase_user.email}")
-        db_user = db.query(User).filter(User.email == supabase_user.email).first()
+        db_user = await _get_user(db, token, supabase_user, user_id)
         
         if not db_user:
-            print(f"GET_CURRENT_USER DEBUG: User {supabase_user.email} not found in database")
+            logger.debug("GET_CURRENT_USER DEBUG: User %s not found in database", supabase_user.email)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found in database. Please complete profile setup."
             )
         
         if not db_user.is_active:
-            print(f"GET_CURRENT_USER DEBUG: User {supabase_user.email} is inactive")
+            logger.debug("GET_CURRENT_USER DEBUG: User %s is inactive", supabase_user.email)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Inactive user"
             )
         
-        print(f"GET_CURRENT_USER DEBUG: Successfully retrieved user from database: {db_user.email}")
+        logger.debug("GET_CURRENT_USER DEBUG: Successfully retrieved user from database: %s", db_user.email)
         return db_user
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        print(f"GET_CURRENT_USER DEBUG: Unexpected error: {e}")
-        print(f"GET_CURRENT_USER DEBUG: Error details: {type(e).__name__}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        logger.warning("GET_CURRENT_USER: unexpected error: %s: %s", type(e).__name__, e)
+        raise _unauthorized("Could not validate credentials")
 
 async def get_current_user_optional(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
 ) -> Optional[User]:
     """
@@ -142,16 +298,15 @@ async def get_current_user_optional(
         
     try:
         # Only use Supabase for token verification
-        user_response = supabase.auth.get_user(token)
-        if not user_response or not user_response.user:
+        supabase_user, user_id = await _verify_token(token)
+        if not supabase_user:
             return None
         
-        supabase_user = user_response.user
         
         # Get user from database - return None if not found
-        db_user = db.query(User).filter(User.email == supabase_user.email).first()
+        db_user = await _get_user(db, token, supabase_user, user_id)
         return db_user
         
     except Exception as e:
-        print(f"get_current_user_optional error: {e}")
+        logger.warning("get_current_user_optional error: %s", e)
         return None
\ No newline at end of file
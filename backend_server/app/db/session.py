@@ -1,7 +1,14 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, declarative_base, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from contextlib import AsyncExitStack
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
 
 # Get database URL from settings
 SQLALCHEMY_DATABASE_URL = settings.get_database_uri()
@@ -10,18 +17,55 @@ SQLALCHEMY_DATABASE_URL = settings.get_database_uri()
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     # Connection pool settings for better performance
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,  # Verify connections before use
-    pool_recycle=300,    # Recycle connections every 5 minutes
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    connect_args={"keepalives": 1, "keepalives_idle": settings.DB_TCP_KEEPALIVES_IDLE},
+    # orjson is much faster than stdlib json for the large JSONB columns
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+)
+
+# Async engine (asyncpg) for endpoints that run on the event loop.
+# AsyncAdaptedQueuePool is set explicitly: the sync QueuePool is not safe here.
+async_engine = create_async_engine(
+    settings.get_async_database_uri(),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    # asyncpg has no client-side keepalive options; have the server probe instead
+    connect_args={"server_settings": {"tcp_keepalives_idle": str(settings.DB_TCP_KEEPALIVES_IDLE)}},
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps committed objects usable without a reload SELECT;
+# server-generated columns are fetched via RETURNING (eager_defaults on the mappers)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Create Base class for models
 Base = declarative_base()
 
+def list_load_options() -> tuple:
+    """
+    Extra loader options for list queries. With STRICT_LOADING enabled any
+    relationship that wasn't eager-loaded raises instead of issuing a query
+    per row, so N+1 regressions show up in dev/CI.
+    """
+    if settings.STRICT_LOADING:
+        return (raiseload('*'),)
+    return ()
+
 def get_db() -> Generator:
     """
     Database dependency that provides a database session
@@ -31,16 +75,31 @@ def get_db() -> Generator:
         yield db
     except Exception as e:
         # Log the error for debugging
-        print(f"Database session error: {e}")
+        logger.error("Database session error: %s", e)
         db.rollback()
         raise
     finally:
         db.close()
 
-# Alternative async version for future use
-async def get_async_db():
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database dependency that provides an AsyncSession
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            # Log the error for debugging
+            logger.error("Database session error: %s", e)
+            await db.rollback()
+            raise
+
+async def warm_async_pool() -> None:
     """
-    Async database dependency (for future use with async SQLAlchemy)
+    Open pool_size connections up front so the first requests after startup
+    don't each pay the connect/auth round trip
     """
-    # This would be implemented when upgrading to async SQLAlchemy
-    pass
\ No newline at end of file
+    async with AsyncExitStack() as stack:
+        for _ in range(settings.DB_ASYNC_POOL_SIZE):
+            await stack.enter_async_context(async_engine.connect())
+    logger.info("DB pool warmed: %s", async_engine.pool.status())
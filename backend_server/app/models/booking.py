@@ -1,31 +1,39 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Text, CheckConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-import enum
 from app.db.session import Base
+from app.models.enums import BookingStatus
 
-class BookingStatus(str, enum.Enum):
-    PENDING = "pending"
-    CONFIRMED = "confirmed"
-    CANCELLED = "cancelled"
-    COMPLETED = "completed"
+# Shared with the column migration in main.py so both stay in step with the enum
+BOOKING_STATUS_CHECK = "status IN (%s)" % ", ".join(f"'{s.value}'" for s in BookingStatus)
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # status is plain text so loading rows skips per-row enum coercion;
+        # BookingStatus is a str enum, so comparisons and filters work unchanged
+        CheckConstraint(BOOKING_STATUS_CHECK, name="ck_bookings_status"),
+        # Serves the availability overlap check
+        Index(
+            "ix_booking_prop_status_dates",
+            "property_id", "status", "check_in_date", "check_out_date",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    property_id = Column(Integer, ForeignKey("properties.id"))
-    user_id = Column(Integer, ForeignKey("users.id"))
+    property_id = Column(Integer, ForeignKey("properties.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     check_in_date = Column(DateTime, nullable=False)
     check_out_date = Column(DateTime, nullable=False)
     total_price = Column(Float, nullable=False)
-    status = Column(Enum(BookingStatus), default=BookingStatus.PENDING)
+    status = Column(String(16), default=BookingStatus.PENDING.value)
     payment_status = Column(String, default="pending")
     special_requests = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
+    # Lazy by default; endpoints that embed these in responses selectinload them
     property = relationship("Property", back_populates="bookings")
     user = relationship("User", back_populates="bookings")
     payments = relationship("Payment", back_populates="booking", cascade="all, delete-orphan") 
\ No newline at end of file
@@ -33,4 +33,12 @@ class PaymentMethodType(str, Enum):
     APPLE_PAY = "apple_pay"
     GOOGLE_PAY = "google_pay"
     BANK_TRANSFER = "bank_transfer"
-    OTHER = "other"
\ No newline at end of file
+    OTHER = "other"
+
+# Status groups for membership tests. The enums are str-based, so plain
+# strings loaded from the database match their members here too.
+ACTIVE_BOOKING_STATUSES = frozenset({BookingStatus.PENDING, BookingStatus.CONFIRMED})
+CLOSED_BOOKING_STATUSES = frozenset({BookingStatus.CANCELLED, BookingStatus.COMPLETED})
+OPEN_PAYMENT_STATUSES = frozenset({PaymentStatus.PENDING, PaymentStatus.AUTHORIZED})
+REFUNDED_PAYMENT_STATUSES = frozenset({PaymentStatus.REFUNDED, PaymentStatus.PARTIALLY_REFUNDED})
+REVIEWED_APPLICATION_STATUSES = frozenset({ApplicationStatus.APPROVED, ApplicationStatus.REJECTED})
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from app.db.session import Base
 import enum
 
@@ -11,13 +12,17 @@ class ApplicationStatus(str, enum.Enum):
 
 class HostApplication(Base):
     __tablename__ = "host_applications"
+    __table_args__ = (
+        # Latest application per user (user_id = ? ORDER BY created_at DESC)
+        Index('ix_host_applications_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     phone = Column(String, nullable=False)
     address = Column(Text, nullable=False)
     bio = Column(Text, nullable=True)
-    verification_documents = Column(Text, nullable=True)
+    verification_documents = Column(JSONB, nullable=True)  # list of document URLs
     status = Column(Enum(ApplicationStatus), default=ApplicationStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
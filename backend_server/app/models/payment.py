@@ -7,7 +7,7 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id"))
+    booking_id = Column(Integer, ForeignKey("bookings.id"), index=True)
     amount = Column(Float, nullable=False)
     payment_method = Column(String, nullable=False)
     transaction_id = Column(String, unique=True)
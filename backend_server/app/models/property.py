@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -13,12 +13,28 @@ class PropertyStatus(str, enum.Enum):
 
 class Property(Base):
     __tablename__ = "properties"
+    # Fetch server-generated values (id, created_at, updated_at) via RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Public listing: status/is_listed filter, newest first
+        Index('ix_properties_status_listed_created', 'status', 'is_listed', 'created_at'),
+        # min_acres/max_acres range filter within the public listing
+        Index('ix_properties_status_listed_acres', 'status', 'is_listed', 'total_acres'),
+        # The hunting_type/wildlife_species filters use the JSONB ? operator
+        Index('ix_properties_hunting_packages_gin', 'hunting_packages', postgresql_using='gin'),
+        Index('ix_properties_wildlife_info_gin', 'wildlife_info', postgresql_using='gin'),
+        # Admin moderation queue: tiny partial index over pending rows only
+        Index('ix_properties_pending', 'id', postgresql_where=text("status = 'PENDING'")),
+        # Trigram indexes so the city/state ILIKE '%...%' search can use an index
+        Index('ix_properties_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
+        Index('ix_properties_state_trgm', 'state', postgresql_using='gin', postgresql_ops={'state': 'gin_trgm_ops'}),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
     
     # Foreign Keys
-    provider_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    provider_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     # Basic Information (Phase 1 - Required)
     property_name = Column(String, nullable=False)
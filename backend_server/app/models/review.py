@@ -5,9 +5,11 @@ from app.db.session import Base
 
 class Review(Base):
     __tablename__ = "reviews"
+    # Fetch server-generated values (id, created_at) via RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    property_id = Column(Integer, ForeignKey("properties.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    property_id = Column(Integer, ForeignKey("properties.id"), index=True)
     rating = Column(Integer, nullable=False)
     comment = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
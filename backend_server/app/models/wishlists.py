@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -8,12 +8,15 @@ class Wishlist(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    # user_id is covered by the unique constraint and ix_wishlists_user_created
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Unique constraint to prevent duplicate wishlists
     __table_args__ = (
         UniqueConstraint('user_id', 'property_id', name='unique_user_property_wishlist'),
+        # "My wishlist" page: user_id = ? ORDER BY created_at DESC (scanned backwards)
+        Index('ix_wishlists_user_created', 'user_id', 'created_at'),
     )
     
     # Relationships
@@ -0,0 +1,78 @@
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Literal, Optional, Tuple, Type, TypeVar, get_args, get_origin
+
+from pydantic import BaseModel, ConfigDict
+from pydantic.fields import FieldInfo
+
+ModelT = TypeVar("ModelT", bound="FastORMModel")
+
+_MISSING = object()
+
+
+def _has_nested_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_has_nested_model(arg) for arg in get_args(annotation))
+
+
+def _needs_coercion(field: FieldInfo) -> bool:
+    """Whether validation would change the stored value (enums, literals, constraints)"""
+    if field.metadata:
+        return True
+    return _coerced_annotation(field.annotation)
+
+
+def _coerced_annotation(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return True
+    if get_origin(annotation) is Literal:
+        return True
+    # Annotated[...] metadata (e.g. StringConstraints) nested inside Optional/List
+    if getattr(annotation, "__metadata__", None):
+        return True
+    return any(_coerced_annotation(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def _construct_plan(cls: Type[BaseModel]) -> Optional[Tuple[Tuple[str, str, FieldInfo], ...]]:
+    """(field name, ORM attribute, field) per field, or None when the class must be validated.
+
+    Validators may rewrite values, nested models need building from ORM
+    relations, and enum/literal/constrained fields need coercing from the raw
+    column values (a status string into its enum member), so any of them
+    sends the class down the validating path.
+    """
+    decorators = cls.__pydantic_decorators__
+    if (decorators.validators or decorators.field_validators
+            or decorators.root_validators or decorators.model_validators):
+        return None
+    if any(_has_nested_model(f.annotation) or _needs_coercion(f) for f in cls.model_fields.values()):
+        return None
+    # from_attributes reads the alias first, so do the same
+    return tuple((name, f.alias or name, f) for name, f in cls.model_fields.items())
+
+
+class FastORMModel(BaseModel):
+    """Response schema that can be built from trusted DB rows without re-validation"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_orm_fast(cls: Type[ModelT], obj: Any) -> ModelT:
+        plan = _construct_plan(cls)
+        if plan is None:
+            return cls.model_validate(obj)
+        values, fields_set = {}, set()
+        for name, attr, field in plan:
+            value = getattr(obj, attr, _MISSING)
+            if value is _MISSING:
+                if field.is_required():
+                    # Let validation report the missing field
+                    return cls.model_validate(obj)
+                # Fill defaults here so the JSON keeps the declared field order
+                value = field.get_default(call_default_factory=True)
+            else:
+                fields_set.add(name)
+            values[name] = value
+        return cls.model_construct(_fields_set=fields_set, **values)
@@ -1,10 +1,16 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from .property import Property
 from .user import User
 
+# Core validators/serializers are built on first use rather than at import;
+# subclasses inherit the setting
+_DEFERRED_CONFIG = ConfigDict(defer_build=True)
+
 class PaymentBase(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     amount: float
     payment_method: str
     transaction_id: Optional[str] = None
@@ -22,6 +28,8 @@ class Payment(PaymentBase):
         from_attributes = True
 
 class BookingBase(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     property_id: int
     check_in_date: datetime
     check_out_date: datetime
@@ -32,6 +40,8 @@ class BookingCreate(BookingBase):
     pass
 
 class BookingUpdate(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     status: Optional[str] = None
     payment_status: Optional[str] = None
     special_requests: Optional[str] = None
@@ -45,12 +55,14 @@ class Booking(BookingBase):
     updated_at: Optional[datetime] = None
     property: Property
     user: User
-    payments: List[Payment] = []
+    payments: List[Payment] = Field(default_factory=list)
 
     class Config:
         from_attributes = True
 
 class BookingSearch(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     user_id: Optional[int] = None
     property_id: Optional[int] = None
     status: Optional[str] = None
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, validator
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator, validator
+from typing import Annotated, List, Optional
 from datetime import datetime
 from enum import Enum
+import orjson
+from app.schemas.base import FastORMModel
 
 class ApplicationStatusEnum(str, Enum):
     PENDING = "pending"
@@ -13,38 +15,32 @@ class HostApplicationBase(BaseModel):
     address: str
     bio: str
 
+_REQUIRED_TEXT_MESSAGES = {
+    'phone': 'Phone number is required',
+    'address': 'Address is required',
+    'bio': 'Bio is required',
+}
+
+def _strip_nonempty(v: str, *, field: str) -> str:
+    v = v.strip() if v else v
+    if not v:
+        raise ValueError(_REQUIRED_TEXT_MESSAGES[field])
+    return v
+
 class HostApplicationCreate(HostApplicationBase):
-    document_urls: List[str]  # Required field - must have at least one document
-    
-    @validator('document_urls')
-    def validate_document_urls(cls, v):
-        if not v or len(v) == 0:
-            raise ValueError('At least one document URL is required')
-        return v
+    # Required field - must have at least one document
+    document_urls: Annotated[List[str], Field(min_length=1)]
     
-    @validator('phone')
-    def validate_phone(cls, v):
-        if not v or len(v.strip()) == 0:
-            raise ValueError('Phone number is required')
-        return v.strip()
-    
-    @validator('address')
-    def validate_address(cls, v):
-        if not v or len(v.strip()) == 0:
-            raise ValueError('Address is required')
-        return v.strip()
-    
-    @validator('bio')
-    def validate_bio(cls, v):
-        if not v or len(v.strip()) == 0:
-            raise ValueError('Bio is required')
-        return v.strip()
+    @field_validator('phone', 'address', 'bio')
+    @classmethod
+    def validate_required_text(cls, v: str, info: ValidationInfo) -> str:
+        return _strip_nonempty(v, field=info.field_name)
 
 class HostApplicationReview(BaseModel):
     status: ApplicationStatusEnum
     admin_comment: Optional[str] = None
 
-class HostApplication(BaseModel):
+class HostApplication(FastORMModel):
     """
     Schema for HostApplication with proper database constraints
     """
@@ -54,7 +50,7 @@ class HostApplication(BaseModel):
     phone: str    # NOT NULL - required for contact
     address: str  # NOT NULL - required for verification
     bio: str      # NOT NULL - required for application
-    status: str   # NOT NULL - every application has a status
+    status: ApplicationStatusEnum  # NOT NULL - every application has a status
     verification_documents: str  # NOT NULL - required for verification
     
     # Timestamps (created_at should probably also be NOT NULL with default)
@@ -64,24 +60,14 @@ class HostApplication(BaseModel):
     reviewed_at: Optional[datetime] = None
     admin_comment: Optional[str] = None
     
-    @validator('status', pre=True)
-    def validate_status(cls, v):
-        """Convert enum to string if needed"""
-        if hasattr(v, 'value'):
-            return v.value
-        elif hasattr(v, 'name'):
-            return v.name
-        return str(v)
-    
     @validator('verification_documents', pre=True)
     def validate_verification_documents(cls, v):
-        """Ensure verification_documents is a valid JSON string"""
+        """Keep the API's JSON-string shape now that the column is a native JSONB list"""
         if isinstance(v, str):
             return v
-        else:
-            import json
-            return json.dumps(v) if v is not None else "[]"
+        return orjson.dumps(v).decode() if v is not None else "[]"
     
-    class Config:
-        from_attributes = True
-        populate_by_name = True
\ No newline at end of file
+    model_config = ConfigDict(
+        from_attributes=True,
+        populate_by_name=True,
+    )
\ No newline at end of file
@@ -1,7 +1,43 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler, StringConstraints, TypeAdapter, computed_field, validator
+from pydantic_core import core_schema
+from typing import Annotated, Optional, Dict, Any, List, Final, Literal, Mapping, Union
+from contextvars import ContextVar, Token
 from datetime import datetime, timezone
-from app.models.enums import PaymentStatus, PaymentMethodType
+from functools import cached_property
+from types import MappingProxyType
+import orjson
+from app.schemas.base import FastORMModel
+from app.models.enums import PaymentStatus, PaymentMethodType, REFUNDED_PAYMENT_STATUSES
+
+_STATUS_DISPLAY: Final[Mapping[PaymentStatus, str]] = MappingProxyType({
+    PaymentStatus.PENDING: "Payment Pending",
+    PaymentStatus.AUTHORIZED: "Payment Authorized",
+    PaymentStatus.PAID: "Payment Completed",
+    PaymentStatus.FAILED: "Payment Failed",
+    PaymentStatus.CANCELLED: "Payment Cancelled",
+    PaymentStatus.REFUNDED: "Refunded",
+    PaymentStatus.PARTIALLY_REFUNDED: "Partially Refunded"
+})
+
+# Per-request clock snapshot; falls back to the wall clock outside a request
+_NOW: ContextVar[Optional[datetime]] = ContextVar("payment_clock", default=None)
+
+def _now() -> datetime:
+    return _NOW.get() or datetime.now(timezone.utc)
+
+def _titled(value: Any) -> str:
+    """Display form of an enum member or raw string, e.g. apple_pay -> Apple Pay"""
+    return str(getattr(value, "value", value)).replace("_", " ").title()
+
+_PM_TYPE_DISPLAY: Final[Mapping[PaymentMethodType, str]] = MappingProxyType({
+    t: _titled(t) for t in PaymentMethodType
+})
+
+# Stripe reports method types PaymentMethodType doesn't list ("link", ...)
+# and those are stored as-is; keep them as plain strings instead of failing
+StoredPaymentMethodType = Annotated[
+    Union[PaymentMethodType, str], Field(union_mode="left_to_right")
+]
 
 class PaymentBase(BaseModel):
     booking_id: int
@@ -28,7 +64,7 @@ class PaymentUpdate(BaseModel):
     refund_amount: Optional[float] = None
     cancellation_reason: Optional[str] = None
 
-class PaymentResponse(BaseModel):
+class PaymentResponse(FastORMModel):
     """Full payment response schema with authorization & capture support"""
     id: int
     booking_id: int
@@ -43,7 +79,7 @@ class PaymentResponse(BaseModel):
     status: PaymentStatus
     
     # Payment method info (non-sensitive)
-    payment_method_type: Optional[PaymentMethodType] = None
+    payment_method_type: Optional[StoredPaymentMethodType] = None
     payment_method_brand: Optional[str] = None
     payment_method_last4: Optional[str] = None
     
@@ -51,7 +87,7 @@ class PaymentResponse(BaseModel):
     transaction_id: Optional[str] = None
     payment_method: str
     
-    # 🔥 NEW: Authorization & capture tracking
+    # NEW: Authorization & capture tracking
     authorized_at: Optional[datetime] = None
     capture_deadline: Optional[datetime] = None
     captured_at: Optional[datetime] = None
@@ -61,14 +97,14 @@ class PaymentResponse(BaseModel):
     failure_reason: Optional[str] = None
     refund_reason: Optional[str] = None
     refund_amount: Optional[float] = None
-    cancellation_reason: Optional[str] = None  # 🔥 NEW
+    cancellation_reason: Optional[str] = None  # NEW
     
-    # 🔥 NEW: Authorization metadata
+    # NEW: Authorization metadata
     authorization_code: Optional[str] = None
     risk_score: Optional[int] = None
     processor_response: Optional[str] = None
     
-    # 🔥 NEW: Capture tracking
+    # NEW: Capture tracking
     capture_requested_by: Optional[int] = None
     capture_requested_at: Optional[datetime] = None
     
@@ -81,79 +117,76 @@ class PaymentResponse(BaseModel):
     updated_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     
-    # 🔥 NEW: Computed properties for authorization flow
-    @property
+    @classmethod
+    def set_clock(cls, now: datetime) -> Token:
+        """Pin the time used by the deadline properties for the current request"""
+        return _NOW.set(now)
+
+    @classmethod
+    def reset_clock(cls, token: Token) -> None:
+        _NOW.reset(token)
+    
+    # NEW: Computed properties for authorization flow
+    @cached_property
     def is_authorized(self) -> bool:
         """Check if payment is in authorized state"""
         return self.status == PaymentStatus.AUTHORIZED
     
-    @property
+    @cached_property
     def is_capturable(self) -> bool:
         """Check if payment can be captured"""
         if not self.is_authorized:
             return False
         
         if self.capture_deadline:
-            return datetime.now(timezone.utc) < self.capture_deadline
+            return _now() < self.capture_deadline
         
         return True
     
-    @property
+    @cached_property
     def is_paid(self) -> bool:
         """Check if payment is completed/paid"""
         return self.status == PaymentStatus.PAID
     
-    @property
+    @cached_property
     def is_cancelled(self) -> bool:
         """Check if authorization was cancelled"""
         return self.status == PaymentStatus.CANCELLED
     
-    @property
+    @cached_property
     def is_refunded(self) -> bool:
         """Check if payment was refunded"""
-        return self.status in [PaymentStatus.REFUNDED, PaymentStatus.PARTIALLY_REFUNDED]
+        return self.status in REFUNDED_PAYMENT_STATUSES
     
-    @property
+    @cached_property
     def days_until_capture_deadline(self) -> int:
         """Get number of days until capture deadline"""
         if not self.capture_deadline:
             return 0
         
-        delta = self.capture_deadline - datetime.now(timezone.utc)
+        delta = self.capture_deadline - _now()
         return max(0, delta.days)
     
-    @property
+    @cached_property
     def formatted_amount(self) -> str:
         """Get formatted amount as currency string"""
         return f"${self.amount:.2f}"
     
-    @property
+    @cached_property
     def payment_method_display(self) -> str:
         """Get user-friendly payment method display"""
         if self.payment_method_brand and self.payment_method_last4:
             brand = self.payment_method_brand.title()
             return f"{brand} ending in {self.payment_method_last4}"
         elif self.payment_method_type:
-            return self.payment_method_type.replace("_", " ").title()
+            return _PM_TYPE_DISPLAY.get(self.payment_method_type) or _titled(self.payment_method_type)
         else:
             return "Card"
     
-    @property
+    @cached_property
     def status_display(self) -> str:
         """Get user-friendly status display"""
-        status_mapping = {
-            PaymentStatus.PENDING: "Payment Pending",
-            PaymentStatus.AUTHORIZED: "Payment Authorized",
-            PaymentStatus.PAID: "Payment Completed",
-            PaymentStatus.FAILED: "Payment Failed",
-            PaymentStatus.CANCELLED: "Payment Cancelled",
-            PaymentStatus.REFUNDED: "Refunded",
-            PaymentStatus.PARTIALLY_REFUNDED: "Partially Refunded"
-        }
-        return status_mapping.get(self.status, self.status.value.title())
-
-    class Config:
-        from_attributes = True
+        return _STATUS_DISPLAY.get(self.status) or _titled(self.status)
 
 
 # Stripe Integration Schemas
@@ -173,11 +206,51 @@ class PaymentConfirmRequest(BaseModel):
     """Schema for confirming a payment"""
     payment_intent_id: str
 
+class RawJSON:
+    """Webhook payload kept as raw JSON and only parsed on first key access"""
+    __slots__ = ('_raw', '_parsed')
+
+    def __init__(self, raw: Any):
+        if isinstance(raw, (bytes, bytearray, memoryview, str)):
+            self._raw, self._parsed = raw, None
+        else:
+            self._raw, self._parsed = None, raw
+
+    def _data(self) -> Dict[str, Any]:
+        if self._parsed is None:
+            self._parsed = orjson.loads(self._raw)
+        return self._parsed
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data()[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data().get(key, default)
+
+    @classmethod
+    def _wrap(cls, value: Any) -> "RawJSON":
+        return value if isinstance(value, cls) else cls(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        # Stripe payloads are large and deeply nested; wrap them instead of
+        # validating recursively, and dump the parsed dict back out
+        return core_schema.no_info_plain_validator_function(
+            cls._wrap,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda value: value._data(), when_used="always"
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> Dict[str, Any]:
+        return {"type": "object"}
+
 class StripeWebhookEvent(BaseModel):
     """Schema for Stripe webhook events"""
     id: str
     type: str
-    data: Dict[str, Any]
+    data: RawJSON
     created: int
     livemode: bool
 
@@ -210,7 +283,7 @@ class StripeMetadata(BaseModel):
     customer_email: str
     platform: str = "huntstay"
 
-# 🔥 NEW: Authorization & Capture specific schemas
+# NEW: Authorization & Capture specific schemas
 class AuthorizationConfirmResponse(BaseModel):
     """Response for successful payment authorization"""
     message: str
@@ -222,7 +295,7 @@ class AuthorizationConfirmResponse(BaseModel):
 
 class CapturePaymentRequest(BaseModel):
     """Schema for capturing an authorized payment"""
-    amount: Optional[int] = None  # Amount in cents, if different from authorized amount
+    amount: Optional[int] = Field(default=None, gt=0, le=10**10)  # Amount in cents, if different from authorized amount
     provider_notes: Optional[str] = None
 
 class CapturePaymentResponse(BaseModel):
@@ -236,7 +309,7 @@ class CapturePaymentResponse(BaseModel):
 
 class CancelAuthorizationRequest(BaseModel):
     """Schema for cancelling a payment authorization"""
-    cancellation_reason: str = Field(..., min_length=1, max_length=500)
+    cancellation_reason: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=500)]
     offer_alternative: Optional[bool] = False
     alternative_message: Optional[str] = None
 
@@ -262,17 +335,17 @@ class RefundResponse(BaseModel):
     message: str
 
 # Payment summary schemas
-class PaymentSummary(BaseModel):
+class PaymentSummary(FastORMModel):
     """Summary of payment for booking display with authorization info"""
     id: int
     booking_id: int
     amount: float
     status: PaymentStatus
-    payment_method_type: Optional[PaymentMethodType] = None
+    payment_method_type: Optional[StoredPaymentMethodType] = None
     payment_method_brand: Optional[str] = None
     payment_method_last4: Optional[str] = None
     
-    # 🔥 NEW: Authorization timing
+    # NEW: Authorization timing
     authorized_at: Optional[datetime] = None
     capture_deadline: Optional[datetime] = None
     captured_at: Optional[datetime] = None
@@ -282,13 +355,13 @@ class PaymentSummary(BaseModel):
     created_at: datetime
     completed_at: Optional[datetime] = None
     
-    # 🔥 NEW: Quick status indicators
-    @property
+    # NEW: Quick status indicators
+    @cached_property
     def is_awaiting_capture(self) -> bool:
         """Check if authorization is awaiting capture"""
         return self.status == PaymentStatus.AUTHORIZED
     
-    @property
+    @cached_property
     def payment_method_display(self) -> str:
         """Get user-friendly payment method display"""
         if self.payment_method_brand and self.payment_method_last4:
@@ -296,15 +369,12 @@ class PaymentSummary(BaseModel):
             return f"{brand} ending in {self.payment_method_last4}"
         return "Card"
     
-    @property
+    @cached_property
     def formatted_amount(self) -> str:
         """Get formatted amount"""
         return f"${self.amount:.2f}"
     
-    class Config:
-        from_attributes = True
-
-# 🔥 NEW: Authorization status schema
+# NEW: Authorization status schema
 class AuthorizationStatus(BaseModel):
     """Current authorization status for a payment"""
     payment_id: int
@@ -318,7 +388,7 @@ class AuthorizationStatus(BaseModel):
     can_be_cancelled: bool
     payment_method_display: Optional[str] = None
 
-# 🔥 NEW: Provider payment dashboard schemas
+# NEW: Provider payment dashboard schemas
 class ProviderPaymentStats(BaseModel):
     """Payment statistics for provider dashboard"""
     total_payments: int
@@ -335,13 +405,22 @@ class ProviderPaymentStats(BaseModel):
     this_month_captured: float
     this_month_authorized: float
     
-    # Payment method breakdown
-    payment_method_breakdown: Dict[PaymentMethodType, int] = {
-        PaymentMethodType.CARD: 0,
-        PaymentMethodType.APPLE_PAY: 0,
-        PaymentMethodType.GOOGLE_PAY: 0,
-        PaymentMethodType.OTHER: 0
-    }
+    # Payment method breakdown, one slot per method
+    card_count: int = 0
+    apple_pay_count: int = 0
+    google_pay_count: int = 0
+    other_count: int = 0
+
+    @computed_field
+    @property
+    def payment_method_breakdown(self) -> Dict[PaymentMethodType, int]:
+        """Dict view kept for API compatibility"""
+        return {
+            PaymentMethodType.CARD: self.card_count,
+            PaymentMethodType.APPLE_PAY: self.apple_pay_count,
+            PaymentMethodType.GOOGLE_PAY: self.google_pay_count,
+            PaymentMethodType.OTHER: self.other_count
+        }
 
 class AuthorizationAlert(BaseModel):
     """Alert for authorizations requiring attention"""
@@ -354,11 +433,11 @@ class AuthorizationAlert(BaseModel):
     expires_in_hours: int
     urgency_level: str  # "low", "medium", "high", "urgent"
 
-# 🔥 NEW: Batch operations for providers
+# NEW: Batch operations for providers
 class BatchPaymentAction(BaseModel):
     """Schema for batch payment operations"""
-    payment_ids: List[int] = Field(..., min_items=1, max_items=50)
-    action: str = Field(..., pattern="^(capture|cancel)$")
+    payment_ids: Annotated[List[Annotated[int, Field(ge=1, le=2**31 - 1)]], Field(min_length=1, max_length=50)]
+    action: Literal["capture", "cancel"]
     reason: Optional[str] = None
 
 class BatchPaymentResult(BaseModel):
@@ -369,7 +448,7 @@ class BatchPaymentResult(BaseModel):
     total_amount_affected: float
 
 
-# 🔥 NEW: Risk assessment schema
+# NEW: Risk assessment schema
 class PaymentRiskAssessment(BaseModel):
     """Payment risk assessment from Stripe"""
     payment_id: int
@@ -377,7 +456,7 @@ class PaymentRiskAssessment(BaseModel):
     risk_level: str = "normal"  # "normal", "elevated", "high"
     outcome: str = "authorized"  # "authorized", "manual_review", "declined"
     reason: Optional[str] = None
-    recommendations: List[str] = []
+    recommendations: List[str] = Field(default_factory=list)
 
 # Health check schema
 class PaymentHealthStatus(BaseModel):
@@ -387,4 +466,21 @@ class PaymentHealthStatus(BaseModel):
     webhook_status: str
     recent_failures: int
     last_successful_payment: Optional[datetime] = None
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+
+# Built once per process; endpoints serialize through these instead of
+# letting FastAPI re-validate the response model on every request
+_PAYMENT_RESPONSE_ADAPTER = TypeAdapter(PaymentResponse)
+
+def serialize_payment(payment: Any) -> bytes:
+    """PaymentResponse JSON for an ORM Payment"""
+    return _PAYMENT_RESPONSE_ADAPTER.dump_json(PaymentResponse.from_orm_fast(payment))
+
+_PAYMENT_SUMMARY_LIST_ADAPTER = TypeAdapter(List[PaymentSummary])
+
+def serialize_payment_summaries(payments: List[Any]) -> bytes:
+    """JSON array of PaymentSummary for ORM Payments"""
+    return _PAYMENT_SUMMARY_LIST_ADAPTER.dump_json(
+        [PaymentSummary.from_orm_fast(p) for p in payments]
+    )
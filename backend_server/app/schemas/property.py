@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, validator
+from typing import Optional, List, Dict, Any, Mapping
 from datetime import datetime
 from enum import Enum
+from typing_extensions import NotRequired, TypedDict
+from app.schemas.base import FastORMModel
 
 class PropertyStatusEnum(str, Enum):
     DRAFT = "DRAFT"
@@ -9,15 +11,16 @@ class PropertyStatusEnum(str, Enum):
     APPROVED = "APPROVED"
     REJECTED = "REJECTED"
 
+# Shared by every schema that accepts both camelCase and snake_case keys
+_ALIASED_CONFIG = ConfigDict(populate_by_name=True)
+
 # Subschemas for better type safety - FIXED with field aliases
 class AcreageBreakdown(BaseModel):
     acres: int
     terrainType: str = Field(alias="terrain_type")  # Accept both camelCase and snake_case
     # description: Optional[str] = None
     
-    class Config:
-        allow_population_by_field_name = True  # Allow both field names
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
 class WildlifeInfo(BaseModel):
     species: str
@@ -25,9 +28,7 @@ class WildlifeInfo(BaseModel):
     populationDensity: int = Field(alias="population_density", ge=0, le=100) 
     #seasonInfo: Optional[str] = Field(default=None, alias="season_info")  # Accept both formats
     
-    class Config:
-        allow_population_by_field_name = True  # Allow both field names
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
 class HuntingPackage(BaseModel):
     name: str
@@ -36,13 +37,11 @@ class HuntingPackage(BaseModel):
     price: float
     maxHunters: int = Field(alias="max_hunters")  # Accept both formats
     description: str
-    includedItems: List[str] = Field(default=[], alias="included_items")  # Accept both formats
+    includedItems: List[str] = Field(default_factory=list, alias="included_items")  # Accept both formats
     accommodationStatus: str = Field(alias="accommodation_status")  # Accept both formats
     defaultAccommodation: Optional[str] = Field(default=None, alias="default_accommodation")  # Accept both formats
     
-    class Config:
-        allow_population_by_field_name = True  # Allow both field names
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
 class AccommodationOption(BaseModel):
     type: str
@@ -52,17 +51,16 @@ class AccommodationOption(BaseModel):
     bathrooms: float
     capacity: int
     pricePerNight: float = Field(alias="price_per_night")  # Accept both formats
-    amenities: List[str] = []
+    amenities: List[str] = Field(default_factory=list)
     
-    class Config:
-        allow_population_by_field_name = True  # Allow both field names
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
-class PropertyImage(BaseModel):
+class PropertyImage(TypedDict):
+    # Plain dicts validated by pydantic-core; no model instance per image
     url: str
-    filename: Optional[str] = None
-    uploaded_at: Optional[str] = None
-    size: Optional[int] = None
+    filename: NotRequired[Optional[str]]
+    uploaded_at: NotRequired[Optional[str]]
+    size: NotRequired[Optional[int]]
 
 # PHASE 1 - Draft Creation Schema
 class PropertyDraftCreate(BaseModel):
@@ -85,16 +83,14 @@ class PropertyDraftCreate(BaseModel):
     # primary_terrain: Optional[str] = None
     
     # Optional for Phase 1 - Handle both naming conventions
-    acreage_breakdown: Optional[List[AcreageBreakdown]] = []
-    wildlife_info: Optional[List[WildlifeInfo]] = []
+    acreage_breakdown: Optional[List[AcreageBreakdown]] = Field(default_factory=list)
+    wildlife_info: Optional[List[WildlifeInfo]] = Field(default_factory=list)
     
     # Images - at least profile image required
-    property_images: List[PropertyImage] = Field(..., min_items=1)
+    property_images: List[PropertyImage] = Field(..., min_length=1)
     profile_image_index: int = 0
     
-    class Config:
-        allow_population_by_field_name = True
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
 # PHASE 2 - Complete Property Schema
 class PropertyCreate(BaseModel):
@@ -115,13 +111,13 @@ class PropertyCreate(BaseModel):
     # Property Details
     total_acres: int = Field(..., gt=0)
     # primary_terrain: Optional[str] = None
-    acreage_breakdown: Optional[List[AcreageBreakdown]] = []
-    wildlife_info: Optional[List[WildlifeInfo]] = []
+    acreage_breakdown: Optional[List[AcreageBreakdown]] = Field(default_factory=list)
+    wildlife_info: Optional[List[WildlifeInfo]] = Field(default_factory=list)
     
     # Phase 2 required fields
-    hunting_packages: List[HuntingPackage] = Field(..., min_items=1)
-    accommodations: List[AccommodationOption] = Field(..., min_items=1)
-    facilities: Optional[List[str]] = []
+    hunting_packages: List[HuntingPackage] = Field(..., min_length=1)
+    accommodations: List[AccommodationOption] = Field(..., min_length=1)
+    facilities: Optional[List[str]] = Field(default_factory=list)
     
     # Additional Info
     rules: Optional[str] = None
@@ -130,12 +126,10 @@ class PropertyCreate(BaseModel):
     season_info: Optional[str] = None
     
     # Images
-    property_images: List[PropertyImage] = Field(..., min_items=1)
+    property_images: List[PropertyImage] = Field(..., min_length=1)
     profile_image_index: int = 0
     
-    class Config:
-        allow_population_by_field_name = True
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
 # Update Schema
 class PropertyUpdate(BaseModel):
@@ -168,9 +162,7 @@ class PropertyUpdate(BaseModel):
     property_images: Optional[List[PropertyImage]] = None
     profile_image_index: Optional[int] = None
     
-    class Config:
-        allow_population_by_field_name = True
-        populate_by_name = True
+    model_config = _ALIASED_CONFIG
 
 # Provider info schema
 class ProviderInfo(BaseModel):
@@ -181,12 +173,11 @@ class ProviderInfo(BaseModel):
     avatar_url: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
-# Response Schema
-class Property(BaseModel):
-    """Complete property response schema"""
+# Response Schemas
+class PropertySimple(FastORMModel):
+    """Simplified property response schema without relationships"""
     id: int
     provider_id: int
     
@@ -205,7 +196,7 @@ class Property(BaseModel):
     
     # Property Details
     total_acres: int
-    #primary_terrain: Optional[str]
+    # primary_terrain: Optional[str]
     acreage_breakdown: Optional[List[AcreageBreakdown]]
     wildlife_info: Optional[List[WildlifeInfo]]
     
@@ -233,77 +224,44 @@ class Property(BaseModel):
     # Timestamps
     created_at: datetime
     updated_at: Optional[datetime]
-    
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        populate_by_name=True,
+    )
+
+class Property(PropertySimple):
+    """Complete property response schema"""
     # Relations - Now we include provider
     provider: Optional[ProviderInfo] = None
     # reviews: Optional[List[dict]] = []
     # avg_rating: Optional[float] = None
 
-    class Config:
-        from_attributes = True
-        allow_population_by_field_name = True
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+# Paginated list response
+class PropertyListResponse(BaseModel):
+    items: List[Property]
+    total: int  # rows matching the filters, regardless of skip or after_id
+    skip: int
+    limit: int
+    next_cursor: Optional[int] = None  # pass as after_id to fetch the next page
 
-# Alternative approach - create a simplified response schema
-class PropertySimple(BaseModel):
-    """Simplified property response schema without relationships"""
+# Admin bulk moderation
+class PropertyReviewItem(BaseModel):
     id: int
-    provider_id: int
-    
-    # Basic Info
-    property_name: str
-    description: str
-    
-    # Location
-    address: str
-    city: str
-    state: str
-    zip_code: str
-    country: str
-    latitude: float
-    longitude: float
-    
-    # Property Details
-    total_acres: int
-    # primary_terrain: Optional[str]
-    acreage_breakdown: Optional[List[AcreageBreakdown]]
-    wildlife_info: Optional[List[WildlifeInfo]]
-    
-    # Hunting & Accommodation
-    hunting_packages: Optional[List[HuntingPackage]]
-    accommodations: Optional[List[AccommodationOption]]
-    facilities: Optional[List[str]]
-    
-    # Additional Info
-    rules: Optional[str]
-    safety_info: Optional[str]
-    license_requirements: Optional[str]
-    season_info: Optional[str]
-    
-    # Images
-    property_images: Optional[List[PropertyImage]]
-    profile_image_index: int
-    
-    # Status
-    status: PropertyStatusEnum
-    admin_feedback: Optional[str]
-    is_listed: bool
-    draft_completed_phase: Optional[int]
-    
-    # Timestamps
-    created_at: datetime
-    updated_at: Optional[datetime]
+    status: PropertyStatusEnum  # APPROVED or REJECTED
+
+class PropertyBulkReview(BaseModel):
+    items: List[PropertyReviewItem]
 
-    class Config:
-        from_attributes = True
-        allow_population_by_field_name = True
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+# Built once per process; the list endpoint serializes through it instead of
+# letting FastAPI re-validate the response model on every request
+_PROPERTY_LIST_ADAPTER = TypeAdapter(PropertyListResponse)
+
+def serialize_property_list(page: dict) -> bytes:
+    """PropertyListResponse JSON (by alias, as FastAPI would emit it)"""
+    return _PROPERTY_LIST_ADAPTER.dump_json(
+        _PROPERTY_LIST_ADAPTER.validate_python(page, from_attributes=True), by_alias=True
+    )
 
 # Search Schema
 class PropertySearch(BaseModel):
@@ -316,3 +274,10 @@ class PropertySearch(BaseModel):
     max_acres: Optional[int] = None
     # terrain: Optional[str] = None
     wildlife_species: Optional[str] = None
+
+_SEARCH_ADAPTER = TypeAdapter(PropertySearch)
+
+def parse_property_search(query_params: Mapping[str, str]) -> Optional[PropertySearch]:
+    """PropertySearch from query params, or None when no search filter was given"""
+    filters = {name: query_params[name] for name in PropertySearch.model_fields if name in query_params}
+    return _SEARCH_ADAPTER.validate_python(filters) if filters else None
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
+from app.schemas.base import FastORMModel
 
 class ReviewBase(BaseModel):
     rating: int
@@ -9,11 +10,10 @@ class ReviewBase(BaseModel):
 class ReviewCreate(ReviewBase):
     property_id: int
 
-class Review(ReviewBase):
+class Review(ReviewBase, FastORMModel):
     id: int
     user_id: int
     property_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,9 +1,22 @@
-from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, StringConstraints, TypeAdapter, validator
+from typing import Annotated, Any, ClassVar, List, Optional
+from functools import lru_cache
 from datetime import datetime
+from app.schemas.base import FastORMModel
+
+# Core validators/serializers are built on first use rather than at import;
+# subclasses inherit the setting
+_DEFERRED_CONFIG = ConfigDict(defer_build=True)
+
+# Shape check for addresses that already passed EmailStr on the way in; runs in
+# pydantic-core instead of email-validator's Python parser
+_EMAIL_RE = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+Email = Annotated[str, StringConstraints(pattern=_EMAIL_RE, max_length=254)]
 
 class UserBase(BaseModel):
-    email: EmailStr
+    model_config = _DEFERRED_CONFIG
+
+    email: Email
     username: str
     full_name: str  # Required field in database
     
@@ -19,11 +32,14 @@ class UserBase(BaseModel):
     is_active: Optional[bool] = True
 
 class UserCreate(UserBase):
+    email: EmailStr  # Full RFC validation for new accounts
     password: str
     # Only require essentials for signup
     full_name: str  # Required for signup
     
 class UserUpdate(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     # All optional for updates - user can update any field
     email: Optional[EmailStr] = None
     username: Optional[str] = None
@@ -40,6 +56,8 @@ class UserUpdate(BaseModel):
 
 # For host applications - validate required fields
 class UserHostValidation(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     phone: str  # Required for hosting
     address: str  # Required for hosting
     city: str  # Required for hosting
@@ -56,7 +74,7 @@ class UserHostValidation(BaseModel):
             raise ValueError('Complete address is required for hosting')
         return v
 
-class UserInDBBase(UserBase):
+class UserInDBBase(UserBase, FastORMModel):
     id: int
     is_verified: bool
     role: str  # "user", "provider", "admin"
@@ -66,73 +84,34 @@ class UserInDBBase(UserBase):
     # IMPORTANT: Add host application status to the base class
     host_application_status: Optional[str] = None  # "pending", "approved", "rejected"
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
-# What gets returned to frontend - FIXED FIELD MAPPING
+# What gets returned to frontend
 class User(UserInDBBase):
-    # Convert to camelCase for frontend - FIXED MAPPINGS
-    fullName: str = Field(alias="full_name")  # Required field - not Optional
-    zipCode: Optional[str] = Field(None, alias="zip_code")
-    avatarUrl: Optional[str] = Field(None, alias="avatar_url")
-    isActive: bool = Field(alias="is_active")
-    isVerified: bool = Field(alias="is_verified")
-    createdAt: datetime = Field(alias="created_at")
-    updatedAt: Optional[datetime] = Field(None, alias="updated_at")
-    
-    # FIXED: Correct field mapping for host application status
-    hostApplicationStatus: Optional[str] = Field(None, alias="host_application_status")
-    
-    class Config:
-        from_attributes = True
-        populate_by_name = True
-        allow_population_by_field_name = True
-        # IMPORTANT: This allows both snake_case and camelCase field names
-        extra = "forbid"  # Prevent extra fields
-
-# Alternative approach - if the mapping still doesn't work, try this:
-class UserAlternative(UserInDBBase):
-    """Alternative User schema that exposes snake_case directly"""
-    # Keep everything in snake_case for frontend
-    full_name: str
-    zip_code: Optional[str] = None
-    avatar_url: Optional[str] = None
-    is_active: bool
-    is_verified: bool
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-    
-    # This should work directly without alias
-    host_application_status: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
+    # Emitted in snake_case - the keys the client reads (it also accepts camelCase
+    # for a few of them). No alias fields, so each ORM attribute is read once.
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="forbid",  # Prevent extra fields
+    )
 
 # For checking if user can become a host
 class UserHostReadiness(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     can_apply_for_host: bool
-    missing_fields: list[str] = []
+    missing_fields: list[str] = Field(default_factory=list)
     current_application_status: Optional[str] = None  # Added for completeness
     
+    _REQUIRED: ClassVar[tuple[str, ...]] = ("phone", "address", "city")
+    
     @classmethod
-    def check_user_readiness(cls, user):  # Accept either User type
-        missing = []
-        
-        # Handle both camelCase and snake_case field names
-        phone = getattr(user, 'phone', None)
-        address = getattr(user, 'address', None) 
-        city = getattr(user, 'city', None)
-        host_status = getattr(user, 'hostApplicationStatus', None) or getattr(user, 'host_application_status', None)
-        
-        if not phone:
-            missing.append("phone")
-        if not address:
-            missing.append("address")
-        if not city:
-            missing.append("city")
+    def check_user_readiness(cls, user):  # ORM User or User schema, both snake_case
+        missing = [field for field in cls._REQUIRED if not getattr(user, field)]
+        host_status = user.host_application_status
         
         # User can apply if they have no missing fields AND no existing application
-        can_apply = len(missing) == 0 and host_status is None
+        can_apply = not missing and host_status is None
             
         return cls(
             can_apply_for_host=can_apply,
@@ -141,8 +120,24 @@ class UserHostReadiness(BaseModel):
         )
 
 class Token(BaseModel):
+    model_config = _DEFERRED_CONFIG
+
     access_token: str
     token_type: str
 
 class TokenPayload(BaseModel):
-    sub: Optional[int] = None
\ No newline at end of file
+    model_config = _DEFERRED_CONFIG
+
+    sub: Optional[int] = None
+
+# Created on first use rather than at import, which would build the
+# deferred User schema for every worker whether or not it lists users
+@lru_cache(maxsize=None)
+def _user_list_adapter() -> TypeAdapter:
+    return TypeAdapter(List[User])
+
+def serialize_users(users: List[Any]) -> bytes:
+    """JSON array of User (by alias, as FastAPI would emit it) for ORM users"""
+    return _user_list_adapter().dump_json(
+        [User.from_orm_fast(u) for u in users], by_alias=True
+    )
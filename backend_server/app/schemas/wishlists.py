@@ -1,21 +1,29 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
+from app.schemas.base import FastORMModel
 from app.schemas.property import Property
 from app.schemas.user import User
 
 class WishlistBase(BaseModel):
+    # Built on first use rather than at import; subclasses inherit the setting
+    model_config = ConfigDict(defer_build=True)
+
     property_id: int
 
 class WishlistCreate(WishlistBase):
     pass
 
-class Wishlist(WishlistBase):
+class Wishlist(WishlistBase, FastORMModel):
     id: int
     user_id: int
     created_at: datetime
     property: Optional[Property] = None
     user: Optional[User] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+class WishlistResponse(WishlistBase, FastORMModel):
+    """Wishlist entry returned to the owner, with the property embedded"""
+    id: int
+    user_id: int
+    created_at: datetime
+    property: Optional[Property] = None
\ No newline at end of file
@@ -1,6 +1,7 @@
+from sqlalchemy import exists, func
 from sqlalchemy.orm import Session
 from app.models.booking import Booking
-from app.models.enums import BookingStatus, PaymentStatus
+from app.models.enums import BookingStatus, PaymentStatus, ACTIVE_BOOKING_STATUSES, CLOSED_BOOKING_STATUSES
 from app.models.property import Property
 from app.schemas.booking import BookingCreate
 from datetime import datetime, timezone, timedelta
@@ -94,25 +95,19 @@ class BookingService:
         """
         Check if property is available for given dates
         """
-        query = db.query(Booking).filter(
+        # Standard interval overlap test: a single range predicate that
+        # ix_booking_prop_status_dates can serve
+        conditions = [
             Booking.property_id == property_id,
-            Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-            (
-                (Booking.check_in_date <= check_in_date) & 
-                (Booking.check_out_date > check_in_date)
-            ) | (
-                (Booking.check_in_date < check_out_date) & 
-                (Booking.check_out_date >= check_out_date)
-            ) | (
-                (Booking.check_in_date >= check_in_date) &
-                (Booking.check_out_date <= check_out_date)
-            )
-        )
+            Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+            Booking.check_in_date < check_out_date,
+            Booking.check_out_date > check_in_date,
+        ]
         
         if exclude_booking_id:
-            query = query.filter(Booking.id != exclude_booking_id)
+            conditions.append(Booking.id != exclude_booking_id)
         
-        return query.first() is None
+        return not db.query(exists().where(*conditions)).scalar()
     
     @staticmethod
     def create_booking(
@@ -215,11 +210,17 @@ class BookingService:
         return booking
     
     @staticmethod
-    def confirm_booking(db: Session, booking_id: int) -> Booking:
-        """Mark booking as confirmed (called after successful payment)"""
+    def _get_booking_for_update(db: Session, booking_id: int) -> Booking:
+        """Load a booking for a status change (only the booking row is touched)"""
         booking = db.query(Booking).filter(Booking.id == booking_id).first()
         if not booking:
             raise ValueError("Booking not found")
+        return booking
+    
+    @staticmethod
+    def confirm_booking(db: Session, booking_id: int) -> Booking:
+        """Mark booking as confirmed (called after successful payment)"""
+        booking = BookingService._get_booking_for_update(db, booking_id)
         
         booking.status = BookingStatus.CONFIRMED
         booking.payment_status = PaymentStatus.PAID
@@ -236,11 +237,9 @@ class BookingService:
         refund_payment: bool = False
     ) -> Booking:
         """Cancel a booking with optional refund"""
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
-            raise ValueError("Booking not found")
+        booking = BookingService._get_booking_for_update(db, booking_id)
         
-        if booking.status in [BookingStatus.CANCELLED, BookingStatus.COMPLETED]:
+        if booking.status in CLOSED_BOOKING_STATUSES:
             raise ValueError("Booking cannot be cancelled")
         
         booking.status = BookingStatus.CANCELLED
@@ -256,9 +255,7 @@ class BookingService:
     @staticmethod
     def complete_booking(db: Session, booking_id: int) -> Booking:
         """Mark booking as completed (after hunt is finished)"""
-        booking = db.query(Booking).filter(Booking.id == booking_id).first()
-        if not booking:
-            raise ValueError("Booking not found")
+        booking = BookingService._get_booking_for_update(db, booking_id)
         
         if booking.status != BookingStatus.CONFIRMED:
             raise ValueError("Only confirmed bookings can be completed")
@@ -272,7 +269,13 @@ class BookingService:
     @staticmethod
     def get_booking_statistics(db: Session, user_id: int = None, property_id: int = None) -> Dict[str, Any]:
         """Get booking statistics for user or property"""
-        query = db.query(Booking)
+        # One grouped aggregate instead of loading every booking row
+        query = db.query(
+            Booking.status,
+            Booking.payment_status,
+            func.count(Booking.id),
+            func.coalesce(func.sum(Booking.total_price), 0.0),
+        )
         
         if user_id:
             query = query.filter(Booking.user_id == user_id)
@@ -280,19 +283,33 @@ class BookingService:
         if property_id:
             query = query.filter(Booking.property_id == property_id)
         
-        bookings = query.all()
-        
         stats = {
-            "total_bookings": len(bookings),
-            "pending": len([b for b in bookings if b.status == BookingStatus.PENDING]),
-            "confirmed": len([b for b in bookings if b.status == BookingStatus.CONFIRMED]),
-            "completed": len([b for b in bookings if b.status == BookingStatus.COMPLETED]),
-            "cancelled": len([b for b in bookings if b.status == BookingStatus.CANCELLED]),
-            "total_revenue": sum([b.total_price for b in bookings if b.payment_status == PaymentStatus.PAID]),
+            "total_bookings": 0,
+            "pending": 0,
+            "confirmed": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "total_revenue": 0,
             "average_booking_value": 0
         }
+        status_keys = {
+            BookingStatus.PENDING: "pending",
+            BookingStatus.CONFIRMED: "confirmed",
+            BookingStatus.COMPLETED: "completed",
+            BookingStatus.CANCELLED: "cancelled",
+        }
+        paid_count = 0
+        
+        for booking_status, payment_status, count, total in query.group_by(Booking.status, Booking.payment_status):
+            stats["total_bookings"] += count
+            key = status_keys.get(booking_status)
+            if key:
+                stats[key] += count
+            if payment_status == PaymentStatus.PAID:
+                stats["total_revenue"] += total
+                paid_count += count
         
-        if stats["total_bookings"] > 0:
-            stats["average_booking_value"] = stats["total_revenue"] / len([b for b in bookings if b.payment_status == PaymentStatus.PAID])
+        if paid_count:
+            stats["average_booking_value"] = stats["total_revenue"] / paid_count
         
         return stats
\ No newline at end of file
@@ -1,4 +1,33 @@
-from app.core.supabase import supabase
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared so the edge-function calls reuse pooled connections; closed on shutdown
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=f"{settings.SUPABASE_URL.rstrip('/')}/functions/v1",
+            headers={
+                "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+                "apikey": settings.SUPABASE_KEY,
+            },
+            timeout=10.0,
+        )
+    return _client
+
+async def close_email_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 async def send_booking_confirmation_email(email: str, booking_data: dict) -> None:
     """
@@ -20,15 +49,16 @@ async def send_booking_confirmation_email(email: str, booking_data: dict) -> Non
         Thank you for choosing our service!
         """
         
-        # Send email using Supabase
-        supabase.functions.invoke(
-            'send-email',
-            {
+        # Call the send-email edge function without blocking the event loop
+        response = await _get_client().post(
+            "/send-email",
+            json={
                 'to': email,
                 'subject': subject,
                 'content': content
-            }
+            },
         )
+        response.raise_for_status()
     except Exception as e:
         # Log the error but don't raise it to prevent booking creation from failing
-        print(f"Failed to send booking confirmation email: {str(e)}") 
\ No newline at end of file
+        logger.warning("Failed to send booking confirmation email: %s", e)
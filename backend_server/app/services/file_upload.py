@@ -1,11 +1,16 @@
+import asyncio
 import os
 import aiofiles
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
 from PIL import Image
 import uuid
-from typing import List
-import magic
+from typing import Dict, List, Optional
+try:
+    import pyvips
+except (ImportError, OSError):  # pyvips is optional (and needs libvips); Pillow is the fallback
+    pyvips = None
 
 ALLOWED_IMAGE_TYPES = {
     'image/jpeg': '.jpg',
@@ -14,17 +19,48 @@ ALLOWED_IMAGE_TYPES = {
     'image/webp': '.webp'
 }
 
-async def save_upload_file(upload_file: UploadFile, folder: str = "uploads") -> str:
-    try:
-        # Create directory if it doesn't exist
+# Leading signature bytes of each allowed type (WebP is checked separately:
+# its RIFF header carries the format tag at offset 8)
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+def sniff_image_type(head: bytes) -> str:
+    """MIME type of an allowed image from its first bytes, or 'application/octet-stream'"""
+    for signature, mime in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'application/octet-stream'
+
+# Upload folders already created by this process, folder -> directory path
+_UPLOAD_DIRS: Dict[str, str] = {}
+
+def _upload_dir(folder: str) -> str:
+    """Directory for folder, created on first use only"""
+    upload_dir = _UPLOAD_DIRS.get(folder)
+    if upload_dir is None:
         upload_dir = os.path.join(settings.UPLOAD_DIR, folder)
         os.makedirs(upload_dir, exist_ok=True)
+        _UPLOAD_DIRS[folder] = upload_dir
+    return upload_dir
+
+# Uploads are copied to disk in chunks of this size instead of read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-        # Read file content
-        content = await upload_file.read()
+async def save_upload_file(upload_file: UploadFile, folder: str = "uploads", file_id: Optional[uuid.UUID] = None) -> str:
+    try:
+        upload_dir = _upload_dir(folder)
+
+        # Sniff the type from the first chunk only; the signatures sit in the header
+        head = await upload_file.read(2048)
         
         # Check file type
-        file_type = magic.from_buffer(content, mime=True)
+        file_type = sniff_image_type(head)
         if file_type not in ALLOWED_IMAGE_TYPES:
             raise HTTPException(
                 status_code=400,
@@ -33,12 +69,26 @@ async def save_upload_file(upload_file: UploadFile, folder: str = "uploads") ->
 
         # Generate unique filename
         file_extension = ALLOWED_IMAGE_TYPES[file_type]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        unique_filename = f"{file_id or uuid.uuid4()}{file_extension}"
         file_path = os.path.join(upload_dir, unique_filename)
 
-        # Save file
+        # Stream to disk chunk by chunk so memory use doesn't grow with file size
+        written = 0
         async with aiofiles.open(file_path, 'wb') as out_file:
-            await out_file.write(content)
+            chunk = head
+            while chunk:
+                written += len(chunk)
+                if written > settings.MAX_UPLOAD_SIZE:
+                    break
+                await out_file.write(chunk)
+                chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+        
+        if written > settings.MAX_UPLOAD_SIZE:
+            os.remove(file_path)
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE} bytes"
+            )
 
         # Process image if it's an image file
         if file_type.startswith('image/'):
@@ -46,11 +96,40 @@ async def save_upload_file(upload_file: UploadFile, folder: str = "uploads") ->
 
         return os.path.join(folder, unique_filename)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 async def process_image(file_path: str) -> None:
     """Process uploaded image: resize, optimize, etc."""
+    # Pillow decoding/resizing is CPU-bound and blocking; keep it off the event loop
+    await run_in_threadpool(_process_image_sync, file_path)
+
+# Uploaded images are scaled down to fit within this box
+MAX_IMAGE_SIZE = (1920, 1080)
+
+def _process_image_sync(file_path: str) -> None:
+    if pyvips is not None:
+        _process_image_vips(file_path)
+    else:
+        _process_image_pil(file_path)
+
+def _process_image_vips(file_path: str) -> None:
+    try:
+        # thumbnail decodes only what it needs (shrink-on-load for JPEG) and
+        # never upsizes; the source is read lazily, so write to a temp file
+        img = pyvips.Image.thumbnail(file_path, MAX_IMAGE_SIZE[0], height=MAX_IMAGE_SIZE[1], size="down")
+        if img.hasalpha():
+            img = img.flatten()
+        tmp_path = f"{file_path}.tmp"
+        img.jpegsave(tmp_path, Q=85, optimize_coding=True, strip=True)
+        os.replace(tmp_path, file_path)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
+
+def _process_image_pil(file_path: str) -> None:
     try:
         with Image.open(file_path) as img:
             # Convert to RGB if necessary
@@ -58,9 +137,8 @@ async def process_image(file_path: str) -> None:
                 img = img.convert('RGB')
 
             # Resize if too large
-            max_size = (1920, 1080)
-            if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
+            if img.size[0] > MAX_IMAGE_SIZE[0] or img.size[1] > MAX_IMAGE_SIZE[1]:
+                img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
 
             # Save optimized image
             img.save(file_path, 'JPEG', quality=85, optimize=True)
@@ -79,8 +157,20 @@ async def delete_file(file_path: str) -> None:
 
 async def save_multiple_files(files: List[UploadFile], folder: str = "uploads") -> List[str]:
     """Save multiple files and return their paths."""
-    saved_paths = []
-    for file in files:
-        path = await save_upload_file(file, folder)
-        saved_paths.append(path)
-    return saved_paths 
\ No newline at end of file
+    # One urandom read for the whole batch, sliced into version-4 UUIDs
+    raw = os.urandom(16 * len(files))
+    file_ids = [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, len(raw), 16)]
+    
+    # Uploads are independent, so copy and process them concurrently
+    results = await asyncio.gather(
+        *(save_upload_file(file, folder, file_id) for file, file_id in zip(files, file_ids)),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        # Don't leave the batch half-saved
+        for path in results:
+            if isinstance(path, str):
+                await delete_file(path)
+        raise errors[0]
+    return results 
\ No newline at end of file
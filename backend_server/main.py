@@ -1,34 +1,172 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
 from app.api.api import api_router
+from app.core.cache import query_cache
 from app.core.config import settings
-from app.db.session import engine
-from app.models import user, property, booking, payment
+from app.db.session import Base, engine, warm_async_pool
+# Imported so every table (and its indexes) is registered on Base.metadata
+from app.models import user, property, booking, payment, review, wishlists, host_application
+from app.models.booking import BOOKING_STATUS_CHECK
+from app.schemas.payment import PaymentResponse
+from app.services.email import close_email_client
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
 
-# Create database tables
-user.Base.metadata.create_all(bind=engine)
-property.Base.metadata.create_all(bind=engine)
-booking.Base.metadata.create_all(bind=engine)
-payment.Base.metadata.create_all(bind=engine)
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+CACHE_CLEANUP_INTERVAL = 60  # seconds between sweeps of expired in-memory cache entries
+
+# Any constant works, as long as every worker uses the same one
+_SCHEMA_LOCK_ID = 0x48756E74
+_SCHEMA_LOCK_POLL = 1.0  # seconds between attempts while another worker holds it
+
+def create_tables():
+    # Workers start together and would race on the DDL below (one of them
+    # failing with "already exists" mid-import). The first to take this lock
+    # runs it; the others wait, then find everything in place. The lock is
+    # polled with pg_try_advisory_lock rather than a blocking pg_advisory_lock,
+    # whose waiting statement would hold a snapshot for the whole wait.
+    # AUTOCOMMIT keeps this connection from holding a transaction open between statements.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        lock = text("SELECT pg_try_advisory_lock(:id)")
+        while not conn.execute(lock, {"id": _SCHEMA_LOCK_ID}).scalar():
+            time.sleep(_SCHEMA_LOCK_POLL)
+        try:
+            _create_schema(conn)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _SCHEMA_LOCK_ID})
+
+def _create_schema(conn):
+    # Trigram indexes on properties need pg_trgm
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    # Every model shares one Base, so a single create_all covers all tables
+    Base.metadata.create_all(bind=conn)
+
+    # create_all won't alter existing tables: apply one-time column type changes
+    # (host application documents TEXT -> JSONB, booking status enum -> varchar)
+    conn.execute(text(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'host_applications'
+                  AND column_name = 'verification_documents'
+                  AND data_type = 'text'
+            ) THEN
+                ALTER TABLE host_applications
+                    ALTER COLUMN verification_documents TYPE jsonb
+                    USING verification_documents::jsonb;
+            END IF;
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'bookings'
+                  AND column_name = 'status'
+                  AND data_type = 'USER-DEFINED'
+            ) THEN
+                -- The old enum type stored member names (PENDING); store values
+                ALTER TABLE bookings
+                    ALTER COLUMN status TYPE varchar(16) USING lower(status::text);
+                ALTER TABLE bookings ADD CONSTRAINT ck_bookings_status CHECK ({BOOKING_STATUS_CHECK});
+            END IF;
+        END $$
+    """))
+    # ...and won't add indexes declared after a table already existed
+    _create_missing_indexes(conn)
+
+def _create_missing_indexes(conn):
+    """
+    Build declared indexes an existing table is missing. CONCURRENTLY keeps
+    the table writable while they build (a plain CREATE INDEX, the trigram GIN
+    ones especially, blocks writes for the whole build); IF NOT EXISTS makes
+    indexes that are already there a no-op. Needs an AUTOCOMMIT connection.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+            ddl = ddl.replace(" INDEX IF NOT EXISTS ", " INDEX CONCURRENTLY IF NOT EXISTS ", 1)
+            try:
+                conn.exec_driver_sql(ddl)
+            except DBAPIError as e:
+                # A failed concurrent build leaves an INVALID index behind, which
+                # IF NOT EXISTS then skips: it has to be dropped by hand
+                logger.error("Could not create index %s (drop it if left INVALID): %s", index.name, e)
+
+if settings.AUTO_CREATE_TABLES:
+    create_tables()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # orjson renders response bodies faster than the stdlib json encoder
+    default_response_class=ORJSONResponse,
 )
 
 # Set up CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5000", "https://*.vercel.app", "http://0.0.0.0:5000", "https://localhost:8443", "http://localhost:4173", "http://localhost:8080"],  # Vite's default development server
+    allow_origins=["http://localhost:5000", "http://0.0.0.0:5000", "https://localhost:8443", "http://localhost:4173", "http://localhost:8080"],  # Vite's default development server
+    # Starlette matches allow_origins literally; wildcards need the regex form
+    allow_origin_regex=r"https://.*\.vercel\.app",
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists let preflights use the header values built at startup
+    # instead of echoing each request's Access-Control-Request-Headers
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["authorization", "content-type", "x-requested-with"],
 )
 
+# Snapshot the clock once per request for payment deadline checks
+class RequestClockMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = PaymentResponse.set_clock(datetime.now(timezone.utc))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            PaymentResponse.reset_clock(token)
+
+app.add_middleware(RequestClockMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def startup_warm_db_pool():
+    try:
+        await warm_async_pool()
+    except Exception as e:
+        logger.warning("DB pool warm-up failed: %s", e)
+
+async def _purge_expired_cache_entries():
+    while True:
+        await asyncio.sleep(CACHE_CLEANUP_INTERVAL)
+        # One failed sweep must not end the loop for the life of the worker
+        try:
+            query_cache.cleanup_expired()
+        except Exception:
+            logger.exception("Cache cleanup sweep failed")
+
+@app.on_event("startup")
+async def startup_cache_cleanup():
+    # Keep a reference so the task isn't garbage collected
+    app.state.cache_cleanup_task = asyncio.create_task(_purge_expired_cache_entries())
+
+@app.on_event("shutdown")
+async def shutdown_email_client():
+    await close_email_client()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 